@@ -1,3 +1,4 @@
+import bisect
 import math
 import bpy
 import bmesh
@@ -159,23 +160,22 @@ class Chunker:
 
         chunker_result.set_origin_chunk(origin_chunk)
 
+        # Every plane position is known up front, so each side is split in a single pass
+        north_ys = []
         north_y = origin_chunk_width / 2 + build_depth - slope_width
-        remaining = north_piece
         while north_y < model_bounds.y.max:
-            north_plane_co = Vector((0, north_y, 0))
-            (north_chunk, remaining) = Chunker.split_model(remaining, (north_plane_co, north_plane_no))
-            chunker_result.add_north_chunk(north_chunk)
+            north_ys.append(north_y)
             north_y += build_depth - slope_width
-        chunker_result.add_north_chunk(remaining)
+        for north_chunk in Chunker.split_model_slabs(north_piece, north_ys, north_plane_no):
+            chunker_result.add_north_chunk(north_chunk)
 
+        south_ys = []
         south_y = -1 * origin_chunk_width / 2 - build_depth + slope_width
-        remaining = south_piece
         while south_y > model_bounds.y.min:
-            south_plane_co = Vector((0, south_y, 0))
-            (south_chunk, remaining) = Chunker.split_model(remaining, (south_plane_co, south_plane_no))
-            chunker_result.add_south_chunk(south_chunk)
+            south_ys.append(south_y)
             south_y -= build_depth - slope_width
-        chunker_result.add_south_chunk(remaining)
+        for south_chunk in Chunker.split_model_slabs(south_piece, south_ys, south_plane_no):
+            chunker_result.add_south_chunk(south_chunk)
 
         model_object.hide = True
         return chunker_result
@@ -277,15 +277,15 @@ class Chunker:
 
         chunker_result.set_origin_chunk(origin_chunk)
 
+        # Every plane position is known up front, so the model is split in a single pass
+        south_ys = []
         south_y = south_plane_co[1] - chunk_depth - slope_width
         # south_y = -1 * origin_chunk_width / 2 - build_depth + slope_width
-        remaining = south_piece
         while south_y > model_bounds.y.min:
-            south_plane_co = Vector((0, south_y, 0))
-            (south_chunk, remaining) = Chunker.split_model(remaining, (south_plane_co, south_plane_no))
-            chunker_result.add_south_chunk(south_chunk)
+            south_ys.append(south_y)
             south_y -= build_depth - slope_width
-        chunker_result.add_south_chunk(remaining)
+        for south_chunk in Chunker.split_model_slabs(south_piece, south_ys, south_plane_no):
+            chunker_result.add_south_chunk(south_chunk)
 
         model_object.hide = True
         return chunker_result
@@ -1547,6 +1547,140 @@ class Chunker:
 
         return (model, duplicate)
 
+    """
+    split_model_slabs() splits a blender object around several parallel planes at once. Every
+    plane has the normal plane_no and passes through (0, y, 0) for a y in plane_ys, ordered so
+    that each plane lies further along plane_no than the one before it.
+
+    This gives the same chunks as splitting the positive piece again with split_model() for every
+    plane, but the mesh is only read once: each plane only bisects the faces that straddle it, and
+    every face is then put in its slab by the distance of its centroid along the normal.
+
+    Returns a list of len(plane_ys) + 1 chunks, ordered along plane_no. The first is model itself.
+    """
+
+    @staticmethod
+    def split_model_slabs(model, plane_ys, plane_no):
+        if not plane_ys:
+            return [model]
+
+        scene = bpy.context.scene
+        Chunker.deselect_all_objects()
+
+        # bisect_plane works in the mesh's local space, the planes are given in world space
+        world_to_local = model.matrix_world.inverted()
+        normal = (model.matrix_world.to_3x3().transposed() * plane_no).normalized()
+        plane_cos = [world_to_local * Vector((0, y, 0)) for y in plane_ys]
+        offsets = [plane_co.dot(normal) for plane_co in plane_cos]
+
+        source = bmesh.new()
+        source.from_mesh(model.data)
+
+        # Each face is bisected by the first plane it straddles. Its pieces on the far side of
+        # that plane are carried over to the next plane, in case they straddle that one too
+        straddling_faces = [[] for _ in plane_cos]
+        for face in source.faces[:]:
+            distances = [vertex.co.dot(normal) for vertex in face.verts]
+            first_plane = bisect.bisect_right(offsets, min(distances))
+            if first_plane < len(offsets) and offsets[first_plane] < max(distances):
+                straddling_faces[first_plane].append(face)
+
+        cut_edges = []
+        carried_faces = []
+        for (plane_co, offset, straddlers) in zip(plane_cos, offsets, straddling_faces):
+            next_carried_faces = []
+            for face in carried_faces:
+                distances = [vertex.co.dot(normal) for vertex in face.verts]
+                if min(distances) < offset < max(distances):
+                    straddlers.append(face)
+                elif max(distances) > offset:
+                    next_carried_faces.append(face)
+
+            edges = []
+            if straddlers:
+                cut = bmesh.ops.bisect_plane(
+                    source,
+                    geom=list({vertex for face in straddlers for vertex in face.verts}) +
+                    list({edge for face in straddlers for edge in face.edges}) +
+                    straddlers,
+                    plane_co=plane_co,
+                    plane_no=normal,
+                    clear_inner=False,
+                    clear_outer=False)
+
+                edges = [element for element in cut["geom_cut"]
+                         if isinstance(element, bmesh.types.BMEdge)]
+                next_carried_faces.extend(
+                    element for element in cut["geom"]
+                    if isinstance(element, bmesh.types.BMFace) and
+                    element.calc_center_median().dot(normal) > offset)
+
+            cut_edges.append(edges)
+            carried_faces = next_carried_faces
+
+        # After the bisects every face lies between two consecutive planes, so the slab of a face
+        # is the slab of its centroid
+        slab_faces = [[] for _ in range(len(plane_cos) + 1)]
+        for face in source.faces:
+            slab = bisect.bisect_left(offsets, face.calc_center_median().dot(normal))
+            slab_faces[slab].append(face)
+
+        chunks = [model]
+        for _ in plane_cos:
+            chunk = model.copy()
+            chunk.data = bpy.data.meshes.new("Temp Model Chunk")
+            for material in model.data.materials:
+                chunk.data.materials.append(material)
+            chunk.name = "Temp Model Chunk"
+            scene.objects.link(chunk)
+            chunk.select = False
+            chunks.append(chunk)
+
+        for (slab, chunk) in enumerate(chunks):
+            part = bmesh.new()
+            part_vertices = {}
+            for face in slab_faces[slab]:
+                vertices = []
+                for vertex in face.verts:
+                    part_vertex = part_vertices.get(vertex)
+                    if part_vertex is None:
+                        part_vertex = part.verts.new(vertex.co)
+                        part_vertices[vertex] = part_vertex
+                    vertices.append(part_vertex)
+
+                part_face = part.faces.new(vertices)
+                part_face.material_index = face.material_index
+                part_face.smooth = face.smooth
+
+            # Close the holes left by the planes on either side of this slab, one plane at a time
+            filled = False
+            for edges in cut_edges[max(slab - 1, 0):slab + 1]:
+                fill_edges = []
+                for edge in edges:
+                    ends = [part_vertices.get(vertex) for vertex in edge.verts]
+                    if None not in ends:
+                        fill_edge = part.edges.get(ends)
+                        if fill_edge is not None:
+                            fill_edges.append(fill_edge)
+                if fill_edges:
+                    bmesh.ops.triangle_fill(part, use_beauty=True, use_dissolve=False,
+                                            edges=fill_edges)
+                    filled = True
+            if filled:
+                bmesh.ops.recalc_face_normals(part, faces=part.faces[:])
+
+            bmesh.ops.triangulate(part, faces=part.faces[:], quad_method=0, ngon_method=0)
+
+            part.to_mesh(chunk.data)
+            part.free()
+
+        source.free()
+
+        model.select = True
+        scene.objects.active = model
+
+        return chunks
+
     # @staticmethod
     # def split(chunk, object_width, machine_width, printhead_slope, num_pieces=-1):
     #     if num_pieces == 2:
@@ -151,7 +151,8 @@ class Slicer:
         while map.items():
             arbitrary_value = next(iter(map.values())) # this is a [LineSegment]
 
-            group = Slicer.build_chain(arbitrary_value[0], map)
+            group = []
+            Slicer.build_chain(arbitrary_value[0], map, group)
             groups.append(group)
 
             i += 1
@@ -172,30 +173,32 @@ class Slicer:
 
         return slice
 
-    # @return [LineSegment]
+    # array: [LineSegment]; the chain is appended to it in order, so no level of the recursion
+    # has to copy the chains found below it
+    # @return [LineSegment], the same list as array
     # @recursive
     # Destructive for "map" - segments are removed as they are accessed
     @staticmethod
-    def build_chain(segment, map):
+    def build_chain(segment, map, array):
         left_list = map[segment.getFirst()]
         right_list = map[segment.getSecond()]
 
         left_list.remove(segment)
         right_list.remove(segment)
 
-        array = [segment]
-
         if left_list:
             left_segment = left_list[0]
             if left_segment.getFirst() == segment.getFirst():
                 left_segment.flip()
-            array = Slicer.build_chain(left_segment, map) + array
+            Slicer.build_chain(left_segment, map, array)
+
+        array.append(segment)
 
         if right_list:
             right_segment = right_list[0]
             if right_segment.getSecond() == segment.getSecond():
                 right_segment.flip()
-            array = array + Slicer.build_chain(right_list[0], map)
+            Slicer.build_chain(right_list[0], map, array)
 
         if not left_list and segment.getFirst() in map:
             del map[segment.getFirst()]
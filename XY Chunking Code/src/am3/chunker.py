@@ -6,8 +6,10 @@ from typing import Tuple, List
 import math
 import bpy
 import bmesh
+import numpy as np
 
 from mathutils import Vector
+import am3
 from am3.util import SimulatorMath
 from am3.model import Chunk
 from am3.robot import Robot, RobotParameters
@@ -171,23 +173,22 @@ class Chunker:
         chunker_result = ChunkerResult()
         chunker_result.set_origin_chunk(origin_chunk)
 
+        # Every plane position is known up front, so each side is split in a single pass
+        north_ys = []
         north_y = noncenter_chunk_width
-        remaining = north_piece
         while north_y < model_bounds.y.max:
-            north_plane_co = Vector((0, north_y, 0))
-            (north_chunk, remaining) = Chunker.split_model(remaining, (north_plane_co, north_plane_no))
-            chunker_result.add_north_chunk(north_chunk)
+            north_ys.append(north_y)
             north_y += buildplate_dimension
-        chunker_result.add_north_chunk(remaining)
+        for north_chunk in Chunker.split_model_slabs(north_piece, north_ys, north_plane_no):
+            chunker_result.add_north_chunk(north_chunk)
 
+        south_ys = []
         south_y = -1 * noncenter_chunk_width
-        remaining = south_piece
         while south_y > model_bounds.y.min:
-            south_plane_co = Vector((0, south_y, 0))
-            (south_chunk, remaining) = Chunker.split_model(remaining, (south_plane_co, south_plane_no))
-            chunker_result.add_south_chunk(south_chunk)
+            south_ys.append(south_y)
             south_y -= buildplate_dimension
-        chunker_result.add_south_chunk(remaining)
+        for south_chunk in Chunker.split_model_slabs(south_piece, south_ys, south_plane_no):
+            chunker_result.add_south_chunk(south_chunk)
 
         model_object.hide = True
         return chunker_result
@@ -206,8 +207,9 @@ class Chunker:
         default to :func:`~am3.chunker.Chunker.start_scaled`.
         \n
         Otherwise, this function calculates the two chunking planes needed for two-robot chunking,
-        then iterates those planes outward from the center of the model, slicing the model with
-        :func:`~am3.chunker.Chunker.split_model` as it goes.
+        then iterates those planes outward from the center of the model. The center chunk is cut
+        out with :func:`~am3.chunker.Chunker.split_model`, and each side is then cut at every
+        plane position with :func:`~am3.chunker.Chunker.split_model_slabs`.
 
         :param robots: the Robots that will be printing the chunks
         :type robots: List[Robot]
@@ -267,25 +269,22 @@ class Chunker:
         chunker_result = ChunkerResult()
         chunker_result.set_origin_chunk(origin_chunk)
 
+        # Every plane position is known up front, so each side is split in a single pass
+        north_ys = []
         north_y = origin_chunk_width / 2 + build_depth - slope_width
-        remaining = north_piece
         while north_y < model_bounds.y.max:
-            north_plane_co = Vector((0, north_y, 0))
-            (north_chunk, remaining) = Chunker.split_model(remaining,
-                                                           (north_plane_co, north_plane_no))
-            chunker_result.add_north_chunk(north_chunk)
+            north_ys.append(north_y)
             north_y += build_depth - slope_width
-        chunker_result.add_north_chunk(remaining)
+        for north_chunk in Chunker.split_model_slabs(north_piece, north_ys, north_plane_no):
+            chunker_result.add_north_chunk(north_chunk)
 
+        south_ys = []
         south_y = -1 * origin_chunk_width / 2 - build_depth + slope_width
-        remaining = south_piece
         while south_y > model_bounds.y.min:
-            south_plane_co = Vector((0, south_y, 0))
-            (south_chunk, remaining) = Chunker.split_model(remaining,
-                                                           (south_plane_co, south_plane_no))
-            chunker_result.add_south_chunk(south_chunk)
+            south_ys.append(south_y)
             south_y -= build_depth - slope_width
-        chunker_result.add_south_chunk(remaining)
+        for south_chunk in Chunker.split_model_slabs(south_piece, south_ys, south_plane_no):
+            chunker_result.add_south_chunk(south_chunk)
 
         model_object.hide = True
         return chunker_result
@@ -336,153 +335,6 @@ class Chunker:
         new_chunk = Chunk(remaining, number=counter)
         robot.chunks.append(new_chunk)
 
-    '''
-    @staticmethod
-    def start_scaled(robots: List[Robot], model_object: bpy.types.Object):
-        """
-        Performs SPAR3 chunking on ``model_object``, using ``robots``.
-        \n
-        In the cases where ``len(robots) < 4``, either single-robot chunking or two-robot
-        chunking is used. Otherwise, full SPAR3 chunking is used.
-        \n
-        Assuming a proper two-robot chunk, the SPAR3 chunking process simply subdivides every chunk
-        in the two-robot chunk lengthwise, and in the exact same way for every chunk. This method
-        also takes care of assigning chunk dependencies and assigning chunks to the proper robot.
-
-        :param robots: the robots that will be used to print this model
-        :type robots: List[Robot]
-        :param model_object: the model to be printed
-        :type model_object: bpy.types.Object
-        """
-
-        if len(robots) == 1:
-            Chunker.start_single(robots[0], model_object)
-            return
-
-        # red, white, and blue, Arkansas flag shades
-        colors = [(255, 10, 27), (0, 30, 83), (255, 255, 255)]
-
-        color_index = 0
-
-        robot_parameters = robots[0].parameters
-        robot_width = robot_parameters.width
-        printhead_slope = robot_parameters.printhead_slope
-
-        model_bounds = SimulatorMath.calculate_bounds(model_object)
-        model_width = model_bounds.x.max - model_bounds.x.min
-
-        #chunker_result = Chunker.start(robots, model_object, number_of_robots=2)
-
-        chunker_result = Chunker.buildplate_chunking(robots, model_object, number_of_machines=2)
-
-        chunk_row = Chunker.subdivide_row(chunker_result.origin_chunk,
-                                          model_width,
-                                          robot_width,
-                                          printhead_slope,
-                                          num_pieces=len(robots))
-
-        chunk_number = len(chunk_row) - 1
-        for (i, chunk) in enumerate(chunk_row):
-            new_chunk = Chunk(chunk, number=i)
-            new_chunk.color = colors[color_index]
-
-            robot_number = i - (i % 2)
-            robots[robot_number].chunks.append(new_chunk)
-
-            new_chunk.set_name("Robot {} Chunk {}".format(robot_number, i))
-
-            if i % 2 == 1:
-                new_chunk.add_dependency(i - 1)
-                if (i + 1) < len(chunk_row):
-                    new_chunk.add_dependency(i + 1)
-
-        center_chunk_dependencies = list(range(0, len(chunk_row)))
-        previous_row_dependencies = list(range(0, len(chunk_row)))
-        last_chunk_number = center_chunk_dependencies[-1]
-
-        row_number = 0
-
-        color_index = 1
-
-        for south_chunk in chunker_result.south_chunks:
-            row_number += 1
-
-            chunk_row = Chunker.subdivide_row(south_chunk,
-                                              model_width,
-                                              robot_width,
-                                              printhead_slope,
-                                              num_pieces=len(robots))
-
-            next_row_dependencies = []
-
-            for (i, chunk) in enumerate(chunk_row):
-                chunk_number = i + last_chunk_number + 1
-                next_row_dependencies.append(chunk_number)
-                new_chunk = Chunk(chunk, number=chunk_number)
-                new_chunk.row = -1 * row_number
-                new_chunk.color = colors[color_index]
-                new_chunk.add_dependency(previous_row_dependencies)
-
-                robot_number = i - (i % 2)
-                robots[robot_number].chunks.append(new_chunk)
-
-                new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
-
-                if i % 2 == 1:
-                    new_chunk.add_dependency(chunk_number - 1)
-                    if (i + 1) < len(chunk_row):
-                        new_chunk.add_dependency(chunk_number + 1)
-
-            previous_row_dependencies = next_row_dependencies
-            next_row_dependencies = []
-            last_chunk_number = previous_row_dependencies[-1]
-
-            color_index += 1
-            if color_index > 2:
-                color_index = 0
-
-        previous_row_dependencies = center_chunk_dependencies
-
-        row_number = 0
-
-        color_index = 2
-
-        for north_chunk in chunker_result.north_chunks:
-            row_number += 1
-            chunk_row = Chunker.subdivide_row(north_chunk,
-                                              model_width,
-                                              robot_width,
-                                              printhead_slope,
-                                              num_pieces=len(robots))
-            next_row_dependencies = []
-
-            for (i, chunk) in enumerate(chunk_row):
-                chunk_number = i + last_chunk_number + 1
-                next_row_dependencies.append(chunk_number)
-                new_chunk = Chunk(chunk, number=chunk_number)
-                new_chunk.row = row_number
-                new_chunk.color = colors[color_index]
-                new_chunk.add_dependency(previous_row_dependencies)
-
-                robot_number = i - (i % 2) + 1
-                robots[robot_number].chunks.append(new_chunk)
-
-                new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
-
-                if i % 2 == 1:
-                    new_chunk.add_dependency(chunk_number - 1)
-                    if (i + 1) < len(chunk_row):
-                        new_chunk.add_dependency(chunk_number + 1)
-
-            previous_row_dependencies = next_row_dependencies
-            next_row_dependencies = []
-            last_chunk_number = previous_row_dependencies[-1]
-
-            color_index -= 1
-            if color_index < 0:
-                color_index = 2
-
-    '''
     @staticmethod
     def start_scaled(robots: List[Robot], model_object: bpy.types.Object):
         """
@@ -508,7 +360,7 @@ class Chunker:
         # red, white, and blue, Arkansas flag shades
         colors = [(255, 10, 27), (0, 30, 83), (255, 255, 255)]
 
-        color_index = 0
+        assign_metadata = am3.settings.ASSIGN_CHUNK_METADATA
 
         robot_parameters = robots[0].parameters
         robot_width = robot_parameters.width
@@ -524,11 +376,38 @@ class Chunker:
                                           robot_width,
                                           printhead_slope,
                                           num_pieces=len(robots))
+        south_rows = [Chunker.subdivide_row_newChunking(south_chunk,
+                                                        model_width,
+                                                        robot_width,
+                                                        printhead_slope,
+                                                        num_pieces=len(robots))
+                      for south_chunk in chunker_result.south_chunks]
+        north_rows = [Chunker.subdivide_row_newChunking(north_chunk,
+                                                        model_width,
+                                                        robot_width,
+                                                        printhead_slope,
+                                                        num_pieces=len(robots))
+                      for north_chunk in chunker_result.north_chunks]
+
+        # The owner of every chunk is known once all rows are subdivided, so each robot's chunk
+        # list is grown once up front and then filled in place
+        chunk_counts = [0] * len(robots)
+        for row in [chunk_row] + south_rows:
+            for i in range(len(row)):
+                chunk_counts[robot_num[i % len(robot_num)] - (i % 2)] += 1
+        for row in north_rows:
+            for i in range(len(row)):
+                chunk_counts[robot_num[i % len(robot_num)] - (i % 2) + 1] += 1
+
+        cursors = [len(robot.chunks) for robot in robots]
+        for (robot, count) in zip(robots, chunk_counts):
+            robot.chunks.extend([None] * count)
 
         chunk_number = len(chunk_row) - 1
         for (i, chunk) in enumerate(chunk_row):
             new_chunk = Chunk(chunk, number=i)
-            new_chunk.color = colors[color_index]
+            if assign_metadata:
+                new_chunk.color = colors[0]
 
             #robot_number = i - (i % 2)
             if i >= len(robot_num):
@@ -536,9 +415,11 @@ class Chunker:
             else:
                 robot_number = robot_num[i] - (i % 2)
 
-            robots[robot_number].chunks.append(new_chunk)
+            robots[robot_number].chunks[cursors[robot_number]] = new_chunk
+            cursors[robot_number] += 1
 
-            new_chunk.set_name("Robot {} Chunk {}".format(robot_number, i))
+            if assign_metadata:
+                new_chunk.set_name("Robot {} Chunk {}".format(robot_number, i))
 
             if i % 2 == 1:
                 new_chunk.add_dependency(i - 1)
@@ -551,17 +432,13 @@ class Chunker:
 
         row_number = 0
 
-        color_index = 1
+        # Rows alternate colors moving away from the origin row: south rows step forward through
+        # the palette and north rows step backward
+        south_colors = [colors[(1 + k) % 3] for k in range(len(south_rows))]
 
-        for south_chunk in chunker_result.south_chunks:
+        for chunk_row in south_rows:
             row_number += 1
 
-            chunk_row = Chunker.subdivide_row_newChunking(south_chunk,
-                                              model_width,
-                                              robot_width,
-                                              printhead_slope,
-                                              num_pieces=len(robots))
-
             next_row_dependencies = []
 
             for (i, chunk) in enumerate(chunk_row):
@@ -569,7 +446,8 @@ class Chunker:
                 next_row_dependencies.append(chunk_number)
                 new_chunk = Chunk(chunk, number=chunk_number)
                 new_chunk.row = -1 * row_number
-                new_chunk.color = colors[color_index]
+                if assign_metadata:
+                    new_chunk.color = south_colors[row_number - 1]
                 new_chunk.add_dependency(previous_row_dependencies)
 
                 #robot_number = i - (i % 2)
@@ -577,9 +455,11 @@ class Chunker:
                     robot_number = robot_num[i % len(robot_num)] - (i % 2)
                 else:
                     robot_number = robot_num[i] - (i % 2)
-                robots[robot_number].chunks.append(new_chunk)
+                robots[robot_number].chunks[cursors[robot_number]] = new_chunk
+                cursors[robot_number] += 1
 
-                new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
+                if assign_metadata:
+                    new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
 
                 if i % 2 == 1:
                     new_chunk.add_dependency(chunk_number - 1)
@@ -590,23 +470,14 @@ class Chunker:
             next_row_dependencies = []
             last_chunk_number = previous_row_dependencies[-1]
 
-            color_index += 1
-            if color_index > 2:
-                color_index = 0
-
         previous_row_dependencies = center_chunk_dependencies
 
         row_number = 0
 
-        color_index = 2
+        north_colors = [colors[(2 - k) % 3] for k in range(len(north_rows))]
 
-        for north_chunk in chunker_result.north_chunks:
+        for chunk_row in north_rows:
             row_number += 1
-            chunk_row = Chunker.subdivide_row_newChunking(north_chunk,
-                                              model_width,
-                                              robot_width,
-                                              printhead_slope,
-                                              num_pieces=len(robots))
             next_row_dependencies = []
 
             for (i, chunk) in enumerate(chunk_row):
@@ -614,7 +485,8 @@ class Chunker:
                 next_row_dependencies.append(chunk_number)
                 new_chunk = Chunk(chunk, number=chunk_number)
                 new_chunk.row = row_number
-                new_chunk.color = colors[color_index]
+                if assign_metadata:
+                    new_chunk.color = north_colors[row_number - 1]
                 new_chunk.add_dependency(previous_row_dependencies)
 
                 #robot_number = i - (i % 2) + 1
@@ -622,9 +494,11 @@ class Chunker:
                     robot_number = robot_num[i%len(robot_num)] - (i % 2) + 1
                 else:
                     robot_number = robot_num[i] - (i % 2) + 1
-                robots[robot_number].chunks.append(new_chunk)
+                robots[robot_number].chunks[cursors[robot_number]] = new_chunk
+                cursors[robot_number] += 1
 
-                new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
+                if assign_metadata:
+                    new_chunk.set_name("Robot {} Chunk {}".format(robot_number, chunk_number))
 
                 if i % 2 == 1:
                     new_chunk.add_dependency(chunk_number - 1)
@@ -635,10 +509,6 @@ class Chunker:
             next_row_dependencies = []
             last_chunk_number = previous_row_dependencies[-1]
 
-            color_index -= 1
-            if color_index < 0:
-                color_index = 2
-
 
     @staticmethod
     def split_model(model: bpy.types.Object,
@@ -661,61 +531,239 @@ class Chunker:
 
         scene = bpy.context.scene
         Chunker.deselect_all_objects()
-        model.select = True
-        scene.objects.active = model
-
-        plane_co = plane_data[0]
-        plane_no = plane_data[1]
 
-        bpy.ops.object.duplicate()
+        # bisect_plane works in the mesh's local space, plane_data is given in world space
+        plane_co = model.matrix_world.inverted() * plane_data[0]
+        plane_no = (model.matrix_world.to_3x3().transposed() * plane_data[1]).normalized()
+
+        source = bmesh.new()
+        source.from_mesh(model.data)
+
+        cut = bmesh.ops.bisect_plane(source,
+                                     geom=source.verts[:] + source.edges[:] + source.faces[:],
+                                     plane_co=plane_co,
+                                     plane_no=plane_no,
+                                     clear_inner=False,
+                                     clear_outer=False)
+
+        source.verts.index_update()
+        source.edges.index_update()
+        cut_edges = [element.index for element in cut["geom_cut"]
+                     if isinstance(element, bmesh.types.BMEdge)]
+
+        # After the bisect every face lies entirely on one side of the plane, so the side of a
+        # face is the side of its centroid
+        positive_faces = np.zeros(len(source.faces), dtype=bool)
+        if len(source.faces) > 0:
+            coordinates = np.array([vertex.co[:] for vertex in source.verts])
+            distances = coordinates.dot(plane_no[:]) - np.dot(plane_co[:], plane_no[:])
+
+            face_sizes = np.array([len(face.verts) for face in source.faces])
+            face_vertices = np.array([vertex.index for face in source.faces for vertex in face.verts])
+            face_starts = np.concatenate(([0], np.cumsum(face_sizes)[:-1]))
+
+            centroid_distances = np.add.reduceat(distances[face_vertices], face_starts) / face_sizes
+            positive_faces = centroid_distances > 0
+
+        duplicate = model.copy()
+        duplicate.data = model.data.copy()
+        duplicate.name = "Temp Model Chunk"
+        scene.objects.link(duplicate)
 
-        duplicate = bpy.context.object
-        if duplicate is None:
-            return (None, None)
+        for (target, removed_faces) in ((model, positive_faces), (duplicate, ~positive_faces)):
+            half = source.copy()
+            half.edges.ensure_lookup_table()
+            half.faces.ensure_lookup_table()
 
-        duplicate.name = "Temp Model Chunk"
+            fill_edges = [half.edges[i] for i in cut_edges]
+            bmesh.ops.delete(half,
+                             geom=[half.faces[i] for i in np.flatnonzero(removed_faces).tolist()],
+                             context=5)
 
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.bisect(
-            plane_co=plane_co,
-            plane_no=plane_no,
-            use_fill=True,
-            clear_inner=True
-        )
-        bpy.ops.object.mode_set(mode='OBJECT')
+            # Close the hole left by the removed side
+            fill_edges = [edge for edge in fill_edges if edge.is_valid]
+            if fill_edges:
+                bmesh.ops.triangle_fill(half, use_beauty=True, use_dissolve=False, edges=fill_edges)
+                bmesh.ops.recalc_face_normals(half, faces=half.faces[:])
 
-        temp_bmesh = bmesh.new()
-        temp_bmesh.from_mesh(duplicate.data)
+            bmesh.ops.triangulate(half, faces=half.faces[:], quad_method=0, ngon_method=0)
 
-        bmesh.ops.triangulate(temp_bmesh, faces=temp_bmesh.faces[:], quad_method=0, ngon_method=0)
+            half.to_mesh(target.data)
+            half.free()
 
-        temp_bmesh.to_mesh(duplicate.data)
-        temp_bmesh.free()
+        source.free()
 
         duplicate.select = False
         model.select = True
         scene.objects.active = model
 
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.mesh.bisect(
-            plane_co=plane_co,
-            plane_no=plane_no,
-            use_fill=True,
-            clear_outer=True
-        )
-        bpy.ops.object.mode_set(mode='OBJECT')
+        return (model, duplicate)
+
+    @staticmethod
+    def split_model_slabs(model: bpy.types.Object,
+                          plane_ys: List[float],
+                          plane_no: Vector) -> List[bpy.types.Object]:
+        """
+        Splits ``model`` around several parallel planes at once. Every plane has the normal
+        ``plane_no`` and passes through ``(0, y, 0)`` for a ``y`` in ``plane_ys``, which should be
+        ordered so that each plane lies further along ``plane_no`` than the one before it.
+        \n
+        The result is the same as cutting the positive piece again with
+        :func:`~am3.chunker.Chunker.split_model` for every plane, but the mesh is only read once.
+        Each plane only bisects the faces that straddle it, and every face is then put in its
+        slab by the distance of its centroid along the normal.
+        \n
+        Returns ``len(plane_ys) + 1`` chunks, ordered along ``plane_no``. The first is ``model``
+        itself.
+
+        :param model: the Blender model to split
+        :type model: bpy.types.Object
+        :param plane_ys: the Y coordinate of every plane, in order along ``plane_no``
+        :type plane_ys: List[float]
+        :param plane_no: the normal shared by every plane
+        :type plane_no: Vector
+        :return: the chunks between consecutive planes, in order along ``plane_no``
+        :rtype: List[bpy.types.Object]
+        """
+
+        if not plane_ys:
+            return [model]
 
-        temp_bmesh = bmesh.new()
-        temp_bmesh.from_mesh(model.data)
+        scene = bpy.context.scene
+        Chunker.deselect_all_objects()
 
-        bmesh.ops.triangulate(temp_bmesh, faces=temp_bmesh.faces[:], quad_method=0, ngon_method=0)
+        # bisect_plane works in the mesh's local space, the planes are given in world space
+        world_to_local = model.matrix_world.inverted()
+        normal = (model.matrix_world.to_3x3().transposed() * plane_no).normalized()
+        plane_cos = [world_to_local * Vector((0, y, 0)) for y in plane_ys]
+        offsets = np.array([plane_co.dot(normal) for plane_co in plane_cos])
+
+        source = bmesh.new()
+        source.from_mesh(model.data)
+
+        def face_distances():
+            # The distance along the normal of every face corner, with where each face starts
+            source.verts.index_update()
+            distances = np.array([vertex.co[:] for vertex in source.verts]).dot(normal[:])
+            face_sizes = np.array([len(face.verts) for face in source.faces])
+            face_vertices = np.array([vertex.index
+                                      for face in source.faces for vertex in face.verts])
+            face_starts = np.concatenate(([0], np.cumsum(face_sizes)[:-1]))
+            return (distances[face_vertices], face_starts, face_sizes)
+
+        # Each face is bisected by the first plane it straddles. Its pieces on the far side of
+        # that plane are carried over to the next plane, in case they straddle that one too
+        straddling_faces = [[] for _ in plane_cos]
+        faces = source.faces[:]
+        if faces:
+            (corner_distances, face_starts, _) = face_distances()
+            min_distances = np.minimum.reduceat(corner_distances, face_starts)
+            max_distances = np.maximum.reduceat(corner_distances, face_starts)
+
+            first_planes = np.searchsorted(offsets, min_distances, side='right')
+            crosses = first_planes < len(offsets)
+            crosses[crosses] = offsets[first_planes[crosses]] < max_distances[crosses]
+            for i in np.flatnonzero(crosses).tolist():
+                straddling_faces[first_planes[i]].append(faces[i])
+
+        cut_edges = []
+        carried_faces = []
+        for (plane_co, offset, straddlers) in zip(plane_cos, offsets.tolist(), straddling_faces):
+            next_carried_faces = []
+            for face in carried_faces:
+                distances = [vertex.co.dot(normal) for vertex in face.verts]
+                if min(distances) < offset < max(distances):
+                    straddlers.append(face)
+                elif max(distances) > offset:
+                    next_carried_faces.append(face)
+
+            edges = []
+            if straddlers:
+                cut = bmesh.ops.bisect_plane(
+                    source,
+                    geom=list({vertex for face in straddlers for vertex in face.verts}) +
+                    list({edge for face in straddlers for edge in face.edges}) +
+                    straddlers,
+                    plane_co=plane_co,
+                    plane_no=normal,
+                    clear_inner=False,
+                    clear_outer=False)
+
+                edges = [element for element in cut["geom_cut"]
+                         if isinstance(element, bmesh.types.BMEdge)]
+                next_carried_faces.extend(
+                    element for element in cut["geom"]
+                    if isinstance(element, bmesh.types.BMFace) and
+                    element.calc_center_median().dot(normal) > offset)
+
+            cut_edges.append(edges)
+            carried_faces = next_carried_faces
+
+        # After the bisects every face lies between two consecutive planes, so the slab of a face
+        # is the slab of its centroid
+        slab_faces = [[] for _ in range(len(plane_cos) + 1)]
+        faces = source.faces[:]
+        if faces:
+            (corner_distances, face_starts, face_sizes) = face_distances()
+            centroid_distances = np.add.reduceat(corner_distances, face_starts) / face_sizes
+            for (face, slab) in zip(faces, np.searchsorted(offsets, centroid_distances).tolist()):
+                slab_faces[slab].append(face)
+
+        chunks = [model]
+        for _ in plane_cos:
+            chunk = model.copy()
+            chunk.data = bpy.data.meshes.new("Temp Model Chunk")
+            for material in model.data.materials:
+                chunk.data.materials.append(material)
+            chunk.name = "Temp Model Chunk"
+            scene.objects.link(chunk)
+            chunk.select = False
+            chunks.append(chunk)
+
+        for (slab, chunk) in enumerate(chunks):
+            part = bmesh.new()
+            part_vertices = {}
+            for face in slab_faces[slab]:
+                vertices = []
+                for vertex in face.verts:
+                    part_vertex = part_vertices.get(vertex)
+                    if part_vertex is None:
+                        part_vertex = part.verts.new(vertex.co)
+                        part_vertices[vertex] = part_vertex
+                    vertices.append(part_vertex)
+
+                part_face = part.faces.new(vertices)
+                part_face.material_index = face.material_index
+                part_face.smooth = face.smooth
+
+            # Close the holes left by the planes on either side of this slab, one plane at a time
+            filled = False
+            for edges in cut_edges[max(slab - 1, 0):slab + 1]:
+                fill_edges = []
+                for edge in edges:
+                    ends = [part_vertices.get(vertex) for vertex in edge.verts]
+                    if None not in ends:
+                        fill_edge = part.edges.get(ends)
+                        if fill_edge is not None:
+                            fill_edges.append(fill_edge)
+                if fill_edges:
+                    bmesh.ops.triangle_fill(part, use_beauty=True, use_dissolve=False,
+                                            edges=fill_edges)
+                    filled = True
+            if filled:
+                bmesh.ops.recalc_face_normals(part, faces=part.faces[:])
+
+            bmesh.ops.triangulate(part, faces=part.faces[:], quad_method=0, ngon_method=0)
+
+            part.to_mesh(chunk.data)
+            part.free()
+
+        source.free()
 
-        temp_bmesh.to_mesh(model.data)
-        temp_bmesh.free()
+        model.select = True
+        scene.objects.active = model
 
-        return (model, duplicate)
+        return chunks
 
 
     @staticmethod
@@ -847,14 +895,14 @@ class Chunker:
         wing_slope = Chunker.wing_slope
         center_col = min_top_dim + 2 * wing_slope
         non_center_col = 1/2 * (buildplate_dimension+2*robot_reach_adjacent-(center_col))
-        chunke_per_buildpalte = 3
+        chunks_per_buildplate = 3
 
         width = object_width
         half_width = width / 2
         #if num_pieces != -1:
          #   chunks = num_pieces // 2
         #else:
-        chunks = math.ceil(half_width/(buildplate_dimension + 2*robot_reach_adjacent)*chunke_per_buildpalte)
+        chunks = math.ceil(half_width/(buildplate_dimension + 2*robot_reach_adjacent)*chunks_per_buildplate)
 
         chunk_row = []
         facing_east = True
@@ -16,6 +16,15 @@ class MoveCommand:
     robot's current location.
     """
 
+    OP = 3
+    """
+    Integer tag identifying the command type (``ToolOnCommand`` is ``0``, ``ToolOffCommand`` is
+    ``1``, ``NewLayerCommand`` is ``2``), so command loops can dispatch on ``command.OP`` instead
+    of a chain of ``isinstance`` checks.
+
+    :type: int
+    """
+
     def __init__(self,
                  location: Vector,
                  robot_speed: float = 10,
@@ -32,8 +41,11 @@ class MoveCommand:
         :type color: Tuple[int, int, int]
         """
 
-        self.type = type
         self.location = location * am3.settings.MODEL_SCALE
+        # Plain float copies of ``self.location``, read by calculate_time on every frame step
+        self._x = float(self.location[0])
+        self._y = float(self.location[1])
+        self._z = float(self.location[2])
         self.robot_speed = robot_speed
         self.color = color
 
@@ -50,19 +62,12 @@ class MoveCommand:
         :rtype: float
         """
 
-        x_1 = self.location[0]
-        y_1 = self.location[1]
-        z_1 = self.location[2]
-
-        x_2 = current_location[0]
-        y_2 = current_location[1]
-        z_2 = current_location[2]
+        d_x = self._x - current_location[0]
+        d_y = self._y - current_location[1]
+        d_z = self._z - current_location[2]
 
         # Assuming Gcode coordinate correspond to mm (i.e. (1, 0, 0) is (1mm, 0mm, 0mm))
-        distance = math.sqrt((x_1 - x_2)**2 + (y_1 - y_2)**2 + (z_1 - z_2)**2)
-
-        time_in_seconds = distance / self.robot_speed
-        return time_in_seconds
+        return math.sqrt(d_x * d_x + d_y * d_y + d_z * d_z) / self.robot_speed
 
 
 class ToolOnCommand:
@@ -71,6 +76,9 @@ class ToolOnCommand:
     robot's extruder \"on\", letting it know to extrude material.
     """
 
+    OP = 0
+    """Command type tag, see :attr:`~am3.command.MoveCommand.OP`"""
+
     def __init__(self, params=None):
         """Do nothing"""
         pass
@@ -82,6 +90,9 @@ class ToolOffCommand:
     robot's extruder \"off\", letting it know to stop extruding material.
     """
 
+    OP = 1
+    """Command type tag, see :attr:`~am3.command.MoveCommand.OP`"""
+
     def __init__(self, params=None):
         """Do nothing"""
         pass
@@ -92,6 +103,9 @@ class NewLayerCommand:
     An empty object used to represent the transition from one layer to another.
     """
 
+    OP = 2
+    """Command type tag, see :attr:`~am3.command.MoveCommand.OP`"""
+
     def __init__(self):
         """Do nothing"""
         pass
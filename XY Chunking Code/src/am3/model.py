@@ -8,6 +8,7 @@ Defines various object models used throughout the library. These include:
 
 from typing import Union, List
 import bpy
+import numpy as np
 from mathutils import Vector
 
 
@@ -19,9 +20,10 @@ class Path:
 
     vertices = []
     """
-    This list of vertices that comprise this path
+    This list of vertices that comprise this path. Paths made by the slicer hold plain
+    ``(x, y, z)`` tuples rather than Vectors.
 
-    :type: List[Vector]
+    :type: List[Vector] or List[Tuple[float, float, float]]
     """
 
     def __init__(self):
@@ -50,6 +52,17 @@ class Path:
         else:
             self.vertices.append(item)
 
+    def vertices_array(self) -> np.ndarray:
+        """
+        Returns the vertices of this path as one contiguous ``(n, 3)`` float64 array. The array
+        is a snapshot; changes to ``self.vertices`` after the call are not reflected in it.
+
+        :return: the vertex coordinates, one row per vertex
+        :rtype: numpy.ndarray
+        """
+
+        return np.array([vertex[:3] for vertex in self.vertices], dtype=np.float64).reshape(-1, 3)
+
 
 class Slice:
     """
@@ -133,11 +146,28 @@ class Chunk:
     :type: List[Slice]
     """
 
-    commands = []
+    command_ops = None
+    """
+    The ``OP`` tag of every command generated by the Robot from ``self.slices`` for this Chunk,
+    in execution order. The commands are stored as arrays rather than as one object each; the
+    ``n``-th move in ``command_ops`` goes to ``move_locations[n]`` at ``move_speeds[n]``.
+
+    :type: numpy.ndarray
+    """
+
+    move_locations = None
     """
-    The commands generated by the Robot from ``self.slices`` for this Chunk.
+    The location of every move in ``command_ops``, already scaled by
+    ``am3.settings.MODEL_SCALE``, as an ``(n, 3)`` array.
 
-    :type: List[object]
+    :type: numpy.ndarray
+    """
+
+    move_speeds = None
+    """
+    The robot speed of every move in ``command_ops``, in mm/s.
+
+    :type: numpy.ndarray
     """
 
     color = (255, 255, 255)
@@ -178,11 +208,27 @@ class Chunk:
         self.number = number
         self.dependencies = []
         self.slices = []
-        self.commands = []
+        self.set_commands(np.empty(0, dtype=np.int8), np.empty((0, 3)), np.empty(0))
         self.color = (255, 255, 255)
         self.execution_time = -1
         self.frames = []
 
+    def set_commands(self, ops: np.ndarray, move_locations: np.ndarray, move_speeds: np.ndarray):
+        """
+        Sets the commands for this Chunk. See :attr:`~am3.model.Chunk.command_ops`.
+
+        :param ops: the ``OP`` tag of every command, in execution order
+        :type ops: numpy.ndarray
+        :param move_locations: the scaled location of every move, as an ``(n, 3)`` array
+        :type move_locations: numpy.ndarray
+        :param move_speeds: the speed of every move
+        :type move_speeds: numpy.ndarray
+        """
+
+        self.command_ops = ops
+        self.move_locations = move_locations
+        self.move_speeds = move_speeds
+
     def __getitem__(self, index):
         return self.slices[index]
 
@@ -281,9 +327,8 @@ class Chunk:
         min_z = 0
         for chunk_slice in self.slices:
             for path in chunk_slice.paths:
-                for vertex in path.vertices:
-                    if vertex[2] < min_z:
-                        min_z = vertex[2]
+                if path.vertices:
+                    min_z = min(min_z, float(path.vertices_array()[:, 2].min()))
         return min_z
 
     def shift_paths(self, z_position: float):
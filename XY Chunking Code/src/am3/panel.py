@@ -3,7 +3,8 @@ Contains classes related to the UI panel created in Blender for controlling simu
 """
 import os
 import math
-from typing import List
+import functools
+from typing import List, Tuple
 
 import bpy
 from mathutils import Vector
@@ -39,14 +40,10 @@ class JsonFileOperator(bpy.types.Operator):
             
         apply_global_settings(params)
         model_object = bpy.data.objects[params.model_name]
-        model_object.hide = True
-        model_object.hide_render = True
-
-        material_color = bpy.context.scene.MaterialColor
-        print(material_color)
-        material_color = (int(material_color[0] * 255), int(material_color[1] * 255), int(material_color[2] * 255))
-        print(material_color)
-        
+        set_model_hidden(model_object, True)
+
+        material_color = material_color_to_rgb(tuple(bpy.context.scene.MaterialColor))
+
         if not JsonLoader.load_from_simulation_file(self.filepath, material_color=material_color):
             self.report(
                 {'ERROR_INVALID_INPUT'},
@@ -231,18 +228,19 @@ def validate_parameters(panel) -> SimulationParameters:
     :return: the validated SimulationParameters
     """
 
-    model_name = bpy.context.scene.ObjectModel
-    build_depth = bpy.context.scene.BuildDepth
-    slope_angle = bpy.context.scene.SlopeAngle
-    printhead_depth = bpy.context.scene.PrintheadDepth
-    robot_speed = bpy.context.scene.RobotSpeed
-    suggest_robots = bpy.context.scene.SuggestRobots
-    number_of_robots = bpy.context.scene.NumberOfRobots
-    frames_per_second = bpy.context.scene.FramesPerSecond
-    model_scale = bpy.context.scene.ModelScale
-    slice_thickness = bpy.context.scene.SliceThickness
-    extrusion_diameter = bpy.context.scene.ExtrusionDiameter
-    write_simulation_file = bpy.context.scene.WriteSimulationFile
+    scene = bpy.context.scene
+    model_name = scene.ObjectModel
+    build_depth = scene.BuildDepth
+    slope_angle = scene.SlopeAngle
+    printhead_depth = scene.PrintheadDepth
+    robot_speed = scene.RobotSpeed
+    suggest_robots = scene.SuggestRobots
+    number_of_robots = scene.NumberOfRobots
+    frames_per_second = scene.FramesPerSecond
+    model_scale = scene.ModelScale
+    slice_thickness = scene.SliceThickness
+    extrusion_diameter = scene.ExtrusionDiameter
+    write_simulation_file = scene.WriteSimulationFile
 
     # Check validity of the model object before we hand it to the chunker
     if model_name == "":
@@ -251,13 +249,13 @@ def validate_parameters(panel) -> SimulationParameters:
             "You must select a Blender Mesh for your model.")
         return None
 
-    if not model_name in bpy.data.objects:
+    model_object = bpy.data.objects.get(model_name)
+    if model_object is None:
         panel.report(
             {'ERROR_INVALID_INPUT'},
             "You have selected a Mesh that no longer exists.")
         return None
 
-    model_object = bpy.data.objects[model_name]
     if model_object.type != 'MESH':
         panel.report(
             {'ERROR_INVALID_INPUT'},
@@ -331,7 +329,8 @@ def initialize_robots(params: SimulationParameters) -> List[Robot]:
     model_width = model_bounds.x.max - model_bounds.x.min
 
     if params.suggest_robots:
-        robots_per_side = math.ceil(model_width / robot_width / 2)
+        # Ceiling division, both widths are positive
+        robots_per_side = int(-(-model_width // (2 * robot_width)))
     else:
         robots_per_side = params.number_of_robots // 2
 
@@ -355,16 +354,14 @@ def initialize_robots(params: SimulationParameters) -> List[Robot]:
     robot_count = robots_per_side * 2
     robots = Initializer.import_robots(robot_count, robot_parameters)
 
-    robot_x = -1 * robots_per_side * robot_width
-    for i, robot in enumerate(robots):
-        if i % 2 == 0:
-            # robot is even, therefore on the south side, facing north
-            robot.set_location((robot_x, -30, 0))
-        else:
-            # robot is odd, therefore on the north side, facing south
-            robot.set_location((robot_x, 30, 0))
-            robot.flip()
-            robot_x += 2 * robot_width
+    # Even robots are on the south side, facing north; odd robots are on the north side, facing
+    # south. Each south/north pair shares an x coordinate, spaced two robot widths apart
+    start_x = -1 * robots_per_side * robot_width
+    for (k, (south_robot, north_robot)) in enumerate(zip(robots[0::2], robots[1::2])):
+        robot_x = start_x + 2 * robot_width * k
+        south_robot.set_location((robot_x, -30, 0))
+        north_robot.set_location((robot_x, 30, 0))
+        north_robot.flip()
 
     return robots
 
@@ -386,6 +383,43 @@ def apply_global_settings(params):
         extrusion_diameter=params.extrusion_diameter)
 
 
+def set_model_hidden(model_object: bpy.types.Object, hidden: bool):
+    """
+    Hides or shows ``model_object`` in both the viewport and renders. Blender 2.79 has no single
+    call for both flags, so each is only written when it actually changes; a redundant write
+    would still tag the object for a depsgraph update.
+
+    :param model_object: the Blender object to hide or show
+    :type model_object: bpy.types.Object
+    :param hidden: ``True`` to hide the object, ``False`` to show it
+    :type hidden: bool
+    """
+
+    if model_object.hide != hidden:
+        model_object.hide = hidden
+    if model_object.hide_render != hidden:
+        model_object.hide_render = hidden
+
+
+@functools.lru_cache(maxsize=16)
+def material_color_to_rgb(material_color: Tuple[float, float, float]) -> int:
+    """
+    Converts the ``MaterialColor`` panel value (RGB channels from ``0`` to ``1``) into a single
+    ``0xRRGGBB`` integer, as accepted by
+    :func:`~am3.simulator.scene.JsonLoader.load_from_simulation_file`. Results are memoized,
+    since the color rarely changes between loads.
+
+    :param material_color: the RGB panel color, as a tuple
+    :type material_color: Tuple[float, float, float]
+    :return: the packed RGB color
+    :rtype: int
+    """
+
+    return ((int(material_color[0] * 255) << 16)
+            | (int(material_color[1] * 255) << 8)
+            | int(material_color[2] * 255))
+
+
 class SimulateOperator(bpy.types.Operator):
     """Defines the Blender Operator for the \"Simulate\" button. Each button needs its own operator.
     This one goes through the entire simulation process, from an unchunked model to a full
@@ -410,7 +444,9 @@ class SimulateOperator(bpy.types.Operator):
             * apply global settings,
             * chunk the model using :func:`~am3.chunker.Chunker.start_scaled`,
             * slice the module using :func:`~am3.slicer.Slicer.slice`,
-            * call :func:`~am3.robot.Robot.generate_visualization` for each Robot, and finally
+            * call :func:`~am3.robot.Robot.generate_visualization` for each Robot,
+            * generate every Robot's frames with :func:`~am3.robot.Robot.generate_robot_frames`,
+              and finally
             * call :func:`~am3.simulator.scene.SimulatorScene.simulate`
         """
 
@@ -429,6 +465,9 @@ class SimulateOperator(bpy.types.Operator):
             print("Chunking complete")
             print("Slicing...")
 
+            # Slicing and command generation stay serial: both are pure-Python loops that hold
+            # the GIL, and both read or create Blender data (chunk meshes, extrusion materials),
+            # which the bpy API does not allow from worker threads
             for robot in robots:
                 Slicer.slice(robot.chunks)
             # if our return value isn't a ChunkerResult, then Chunker threw an error.
@@ -439,6 +478,9 @@ class SimulateOperator(bpy.types.Operator):
                     robot.get_number()))
                 robot.generate_visualization()
 
+            print("Generating frames...")
+            Robot.generate_robot_frames(robots)
+
             print("Animating...")
             SimulatorScene.simulate(
                 robots, write_simulation_file=params.write_simulation_file)
@@ -506,23 +548,22 @@ class ResetOperator(bpy.types.Operator):
     def execute(self, _):
         """This is where the Operator code goes. This method does the following:
 
-            * validates the parameters,
             * iterates over every Blender object,
             * for each object, if it should be removed, select it. Otherwise, deselect it
             * objects with \"extrusion\" or \"chunk\" should be removed, as well as any
               robot parts that don't belong to robot ``0``.
-        """
+            * shows the selected model again, if one is selected
 
-        params = validate_parameters(self)
-        if params is None:
-            return {'FINISHED'}
+        The other panel parameters play no part in a reset, so they are not validated here.
+        """
 
         print("Resetting scene")
 
         Initializer.reset_scene()
-        model_object = bpy.data.objects[params.model_name]
-        model_object.hide = False
-        model_object.hide_render = False
+
+        model_object = bpy.data.objects.get(bpy.context.scene.ObjectModel)
+        if model_object is not None:
+            set_model_hidden(model_object, False)
         return {'FINISHED'}
 
 
@@ -538,6 +579,44 @@ def populate_coll(scene):
         scene.coll.add().name = name
 
 
+SCENE_PROPERTIES = (
+    ('ObjectModel', bpy.props.StringProperty, {}),
+    ('BuildDepth', bpy.props.FloatProperty,
+     dict(name="Build Depth", min=0, max=100, default=50)),
+    ('SlopeAngle', bpy.props.FloatProperty,
+     dict(name="Slope Angle °", min=0, max=90, default=45)),
+    ('PrintheadDepth', bpy.props.FloatProperty,
+     dict(name="Printhead Depth", min=0, max=20, default=5)),
+    ('RobotSpeed', bpy.props.FloatProperty,
+     dict(name="Robot Speed", min=0.1, max=100, default=10)),
+    ('SuggestRobots', bpy.props.BoolProperty,
+     dict(name="Suggest Number of Robots", default=True)),
+    ('NumberOfRobots', bpy.props.IntProperty,
+     dict(name="Number of Robots", min=1, max=32, default=4)),
+    ('ModelScale', bpy.props.FloatProperty,
+     dict(name="Model Scale", min=0.01, max=100, default=1.0)),
+    ('FramesPerSecond', bpy.props.FloatProperty,
+     dict(name="Frames Per Second", min=0.01, max=300, default=2)),
+    ('WriteSimulationFile', bpy.props.BoolProperty,
+     dict(name="Write Simulation File", default=False)),
+    ('SliceThickness', bpy.props.FloatProperty,
+     dict(name="Slice Thickness", min=0.01, max=5, default=0.5)),
+    ('ExtrusionDiameter', bpy.props.FloatProperty,
+     dict(name="Extrusion Diameter", min=0.005, max=2.5, default=0.25)),
+    ('MaterialColor', bpy.props.FloatVectorProperty,
+     dict(name="MaterialColor", subtype="COLOR", size=3, min=0.0, max=1.0,
+          default=(1.0, 1.0, 1.0))),
+    ('SimulationJson', bpy.props.StringProperty, dict(subtype="FILE_PATH")),
+)
+"""
+The properties stored on every Blender scene to back the panel widgets, as
+``(name, property function, keyword arguments)``. Used by both :func:`~am3.panel.register`
+and :func:`~am3.panel.unregister`.
+
+:type: Tuple[Tuple[str, function, Dict[str, object]], ...]
+"""
+
+
 def register():
     """
     This is the first method every called. This registers the :class:`~am3.panel.SimulatorPanel`,
@@ -553,38 +632,8 @@ def register():
     bpy.utils.register_class(ResetOperator)
     bpy.utils.register_class(JsonFileOperator)
 
-    bpy.types.Scene.ObjectModel = bpy.props.StringProperty()
-    bpy.types.Scene.BuildDepth = bpy.props.FloatProperty(
-        name="Build Depth", min=0, max=100, default=50)
-    bpy.types.Scene.SlopeAngle = bpy.props.FloatProperty(
-        name="Slope Angle °", min=0, max=90, default=45)
-    bpy.types.Scene.PrintheadDepth = bpy.props.FloatProperty(
-        name="Printhead Depth", min=0, max=20, default=5)
-    bpy.types.Scene.RobotSpeed = bpy.props.FloatProperty(
-        name="Robot Speed", min=0.1, max=100, default=10)
-    bpy.types.Scene.SuggestRobots = bpy.props.BoolProperty(
-        name="Suggest Number of Robots", default=True)
-    bpy.types.Scene.NumberOfRobots = bpy.props.IntProperty(
-        name="Number of Robots", min=1, max=32, default=4)
-    bpy.types.Scene.ModelScale = bpy.props.FloatProperty(
-        name="Model Scale", min=0.01, max=100, default=1.0)
-    bpy.types.Scene.FramesPerSecond = bpy.props.FloatProperty(
-        name="Frames Per Second", min=0.01, max=300, default=2)
-    bpy.types.Scene.WriteSimulationFile = bpy.props.BoolProperty(
-        name="Write Simulation File", default=False)
-    bpy.types.Scene.SliceThickness = bpy.props.FloatProperty(
-        name="Slice Thickness", min=0.01, max=5, default=0.5)
-    bpy.types.Scene.ExtrusionDiameter = bpy.props.FloatProperty(
-        name="Extrusion Diameter", min=0.005, max=2.5, default=0.25)
-    bpy.types.Scene.MaterialColor = bpy.props.FloatVectorProperty(
-        name="MaterialColor",
-        subtype="COLOR",
-        size=4,
-        min=0.0,
-        max=1.0,
-        default=(1.0, 1.0, 1.0, 1.0)
-    )
-    bpy.types.Scene.SimulationJson = bpy.props.StringProperty(subtype="FILE_PATH")
+    for (name, prop, options) in SCENE_PROPERTIES:
+        setattr(bpy.types.Scene, name, prop(**options))
 
 
 def unregister():
@@ -602,16 +651,5 @@ def unregister():
     bpy.utils.unregister_class(ResetOperator)
     bpy.utils.unregister_class(JsonFileOperator)
 
-    del bpy.types.Scene.ObjectModel
-    del bpy.types.Scene.BuildDepth
-    del bpy.types.Scene.SlopeAngle
-    del bpy.types.Scene.PrintheadDepth
-    del bpy.types.Scene.RobotSpeed
-    del bpy.types.Scene.SuggestRobots
-    del bpy.types.Scene.NumberOfRobots
-    del bpy.types.Scene.ModelScale
-    del bpy.types.Scene.FramesPerSecond
-    del bpy.types.Scene.WriteSimulationFile
-    del bpy.types.Scene.SliceThickness
-    del bpy.types.Scene.ExtrusionDiameter
-    del bpy.types.Scene.SimulationJson
+    for (name, _, _) in SCENE_PROPERTIES:
+        delattr(bpy.types.Scene, name)
@@ -3,8 +3,10 @@ Contains the classes used to represent a Robot, and corresponding logic.
 """
 
 from typing import Tuple, List
+import functools
 import math
 import bpy
+import numpy as np
 
 from mathutils import Vector
 
@@ -15,31 +17,83 @@ from am3.command import MoveCommand, ToolOnCommand, ToolOffCommand, NewLayerComm
 from am3.model import Chunk
 
 
-class ChunkFrame:
+@functools.lru_cache(maxsize=512)
+def path_between_points(point1: Tuple[float, float, float],
+                        point2: Tuple[float, float, float],
+                        speed: float,
+                        model_scale: float) -> Tuple[MoveCommand, ...]:
     """
-    Represents the video frames needed to render a chunk.
-    ``self.location`` specifies where a robot printing this chunk should move to for this frame,
-    while ``self.materials`` defines a List of all the extruded material that needs to be placed
-    in this frame.
+    Builds the MoveCommands behind :func:`~am3.robot.Robot.get_path_between_points`. Robots make
+    the same transitions again and again, so results are cached. MoveCommands are never modified
+    after creation, which makes sharing them safe. ``model_scale`` is part of the key because
+    MoveCommand scales its location by ``am3.settings.MODEL_SCALE`` on creation.
+
+    :param point1: the start point, as ``(x, y, z)``
+    :type point1: Tuple[float, float, float]
+    :param point2: the end point, as ``(x, y, z)``
+    :type point2: Tuple[float, float, float]
+    :param speed: the robot's speed
+    :type speed: float
+    :param model_scale: the value of ``am3.settings.MODEL_SCALE``
+    :type model_scale: float
+    :return: the three MoveCommands to move from ``point1`` to ``point2``
+    :rtype: Tuple[MoveCommand, ...]
     """
 
-    location = None
-    """
-    The location to move the respective Robot to
+    return (MoveCommand(Vector((point1[0], point1[1], point1[2] + 0.05)), speed),
+            MoveCommand(Vector((point2[0], point2[1], point1[2] + 0.05)), speed),
+            MoveCommand(Vector(point2), speed))
 
-    :type: Vector
+
+def write_location_keyframes(obj: object, frames: np.ndarray, locations: np.ndarray):
+    """
+    Replaces the location animation of ``obj`` with one key per frame in ``frames``. Each
+    F-Curve gets all of its keys in one ``foreach_set`` call, instead of one ``keyframe_insert``
+    call per key.
+
+    :param obj: the Blender object to animate
+    :type obj: bpy.types.Object
+    :param frames: the frame of each key, shape ``(n,)``, in increasing order
+    :type frames: np.ndarray
+    :param locations: the location at each key, shape ``(n, 3)``
+    :type locations: np.ndarray
     """
 
-    materials = []
+    animation_data = obj.animation_data or obj.animation_data_create()
+    if animation_data.action is None:
+        animation_data.action = bpy.data.actions.new(name=obj.name + "Action")
+    fcurves = animation_data.action.fcurves
+
+    for index in range(3):
+        fcurve = fcurves.find("location", index)
+        if fcurve is not None:
+            fcurves.remove(fcurve)
+        fcurve = fcurves.new("location", index, "Object Transforms")
+        fcurve.keyframe_points.add(len(frames))
+        fcurve.keyframe_points.foreach_set(
+            "co", np.column_stack((frames, locations[:, index])).ravel())
+        fcurve.update()  # recalculates the handles of the new keys
+
+
+class ChunkFrame:
     """
-    A List of all Material objects to be placed in this frame.
+    Represents the video frames needed to render a chunk.
+    ``self.location`` specifies where a robot printing this chunk should move to for this frame,
+    while ``self.materials`` defines a List of all the extruded material that needs to be placed
+    in this frame.
 
-    :type: List[Material]
+    :ivar location: The location to move the respective Robot to
+    :vartype location: Vector
+    :ivar materials: A List of all Material objects to be placed in this frame. Frames without
+        material share an empty tuple instead.
+    :vartype materials: List[Material]
     """
 
-    def __init__(self, location: Vector, materials: List[Material] = []):
+    __slots__ = ('location', 'materials')
+
+    def __init__(self, location: Vector, materials: List[Material] = None):
         self.location = location
-        self.materials = materials
+        self.materials = materials or ()
 
     def has_material(self) -> bool:
         """
@@ -48,7 +102,7 @@ class ChunkFrame:
         :return: whether there is any material in this frame
         :rtype: bool
         """
-        return self.materials is not None and len(self.materials) > 0
+        return bool(self.materials)
 
 
 class RobotParameters:
@@ -108,42 +162,28 @@ class Robot:
     Represents a real-world robot. Robots know their parameters, location, Blender
     representations, and chunks. Robots also know how to convert sliced Chunks into
     commands, and how to convert commands into frame data.
-    """
-
-    parameters = None
-    """
-    The parameters that define the physical characteristics of this robot.
-
-    :type: RobotParameters
-    """
-
-    body_model = None
-    """
-    The Blender object used as the \"body\", or \"base\" model of this robot.
 
-    :type: bpy.types.Object
+    :ivar parameters: The parameters that define the physical characteristics of this robot.
+    :vartype parameters: RobotParameters
+    :ivar body_model: The Blender object used as the \"body\", or \"base\" model of this robot.
+    :vartype body_model: bpy.types.Object
+    :ivar printhead_model: The Blender object used as the \"printhead\" or \"extruder\" of this
+        robot.
+    :vartype printhead_model: bpy.types.Object
+    :ivar last_location: The last location this robot received in
+        :func:`~am3.robot.Robot.set_location`.
+    :vartype last_location: Vector
+    :ivar chunks: The chunks owned by this robot (i.e., the chunks this robot is responsible for
+        printing).
+    :vartype chunks: List[Chunk]
+    :ivar recorded_keyframes: Keyframes recorded by :func:`~am3.robot.Robot.record_keyframe` that
+        have not yet been written by :func:`~am3.robot.Robot.write_recorded_keyframes`. Maps a
+        frame to the body and printhead locations at that frame.
+    :vartype recorded_keyframes: Dict[int, Tuple[Tuple[float, float, float], Tuple[float, float, float]]]
     """
 
-    printhead_model = None
-    """
-    The Blender object used as the \"printhead\" or \"extruder\" of this robot.
-
-    :type: bpy.types.Object
-    """
-
-    last_location = Vector((0, 0, 0))
-    """
-    The last location this robot received in :func:`~am3.robot.Robot.set_location`.
-
-    :type: Vector
-    """
-
-    chunks = []
-    """
-    The chunks owned by this robot (i.e., the chunks this robot is responsible for printing).
-
-    :type: List[Chunk]
-    """
+    __slots__ = ('parameters', 'body_model', 'printhead_model', 'last_location', 'chunks',
+                 'recorded_keyframes')
 
     def __init__(self, parameters: RobotParameters):
         """
@@ -159,12 +199,14 @@ class Robot:
         self.printhead_model = None
         self.last_location = None
         self.chunks = []
+        self.recorded_keyframes = {}
 
 
     def copy(self, flip_direction: bool = False) -> 'Robot':
         """
         Returns a unique copy of this Robot. Copies of this robot also receive new, dedicated
-        Blender objects.
+        Blender objects. The objects share their mesh data with this robot's objects, since robot
+        geometry is never edited, only moved.
 
         :param flip_direction: Whether or not to rotate the robot 180° after copying
             (default ``False``)
@@ -180,14 +222,12 @@ class Robot:
         scene = bpy.context.scene
 
         new_body_model = self.body_model.copy()
-        new_body_model.data = self.body_model.data.copy()
         new_body_model.animation_data_clear()
         scene.objects.link(new_body_model)
         new_body_model.name = 'Robot Body {}'.format(new_robot.get_number())
         new_robot.body_model = new_body_model
 
         new_printhead_model = self.printhead_model.copy()
-        new_printhead_model.data = self.printhead_model.data.copy()
         new_printhead_model.animation_data_clear()
         scene.objects.link(new_printhead_model)
         new_printhead_model.name = 'Robot Printhead {}'.format(new_robot.get_number())
@@ -291,13 +331,48 @@ class Robot:
 
         self.rotate(math.pi)
 
-    def set_keyframe(self):
+    def record_keyframe(self, frame: int):
         """
-        Adds a Blender animation keyframe for the location of the robot body and printhead
+        Records the current location of the robot body and printhead as a keyframe on ``frame``,
+        without touching the Blender animation data. Recording the same frame twice keeps the
+        later location, as inserting a keyframe twice would. The recorded keyframes are applied
+        by :func:`~am3.robot.Robot.write_recorded_keyframes`.
+
+        :param frame: the frame to record the keyframe on
+        :type frame: int
         """
 
-        self.body_model.keyframe_insert(data_path="location")
-        self.printhead_model.keyframe_insert(data_path="location")
+        self.recorded_keyframes[frame] = (tuple(self.body_model.location),
+                                          tuple(self.printhead_model.location))
+
+    def write_recorded_keyframes(self):
+        """
+        Writes the keyframes recorded by :func:`~am3.robot.Robot.record_keyframe` into the
+        location animation of the robot body and printhead, replacing any existing location keys,
+        then forgets them.
+        """
+
+        if not self.recorded_keyframes:
+            return
+
+        frames = sorted(self.recorded_keyframes)
+        locations = np.array([self.recorded_keyframes[frame] for frame in frames],
+                             dtype=np.float32)
+        frames = np.array(frames, dtype=np.float32)
+
+        # A robot that isn't moving is keyed on every frame anyway. Keys in the middle of a run of
+        # identical locations add nothing: the keys at either end of the run have a neighbor with
+        # the same value, so their handles are flat and the curve stays constant without them.
+        if len(frames) > 2:
+            same_as_previous = (locations[1:-1] == locations[:-2]).all(axis=(1, 2))
+            same_as_next = (locations[1:-1] == locations[2:]).all(axis=(1, 2))
+            keep = np.ones(len(frames), dtype=bool)
+            keep[1:-1] = ~(same_as_previous & same_as_next)
+            (frames, locations) = (frames[keep], locations[keep])
+
+        write_location_keyframes(self.body_model, frames, locations[:, 0])
+        write_location_keyframes(self.printhead_model, frames, locations[:, 1])
+        self.recorded_keyframes = {}
 
     def get_location(self) -> Vector:
         """
@@ -329,95 +404,156 @@ class Robot:
         :rtype: List[MoveCommand]
         """
 
-        commands = []
-        next_location = Vector((0, 0, 0.05)) + point1
-        commands.append(MoveCommand(next_location, self.get_speed()))
-        next_location = Vector((point2[0], point2[1], point1[2] + 0.05))
-        commands.append(MoveCommand(next_location, self.get_speed()))
-        next_location = point2
-        commands.append(MoveCommand(next_location, self.get_speed()))
-
-        return commands
+        return list(path_between_points(tuple(point1[:3]), tuple(point2[:3]), self.get_speed(),
+                                        am3.settings.MODEL_SCALE))
 
     def generate_visualization(self):
         """
         Generates the per-chunk commands needed to print the sliced chunks in ``self.chunks``. This
-        process merely involves creating MoveCommands for every point in the sliced chunks, whilst
+        process merely involves creating moves for every point in the sliced chunks, whilst
         toggling the tool on and off when moving between Paths. The robot must also make extra
         movements when moving between chunks. These movements are defined by
-        :func:`~am3.robot.Robot.get_path_between_points`.
+        :func:`~am3.robot.Robot.get_path_between_points`. The commands are stored in each chunk's
+        arrays (see :attr:`~am3.model.Chunk.command_ops`).
         """
         last_location = self.get_location()
         transitioning = False
+        speed = self.get_speed()
+        scale = am3.settings.MODEL_SCALE
+
+        tool_on_op = ToolOnCommand.OP
+        tool_off_op = ToolOffCommand.OP
+        new_layer_op = NewLayerCommand.OP
+        move_op = MoveCommand.OP
 
         for chunk in self.chunks:
-            chunk.commands.append(ToolOffCommand())
-
-            for chunk_slice in chunk.slices:
-                for path in chunk_slice.paths:
-                    if not path.vertices:
-                        continue
-                    if transitioning:
-                        path_commands = self.get_path_between_points(
-                            last_location, path[0])
-                        for command in path_commands:
-                            chunk.commands.append(command)
-                        transitioning = False
-
-                    chunk.commands.append(MoveCommand(path[0], self.get_speed()))
-                    last_location = path[0]
-                    chunk.commands.append(ToolOnCommand())
-
-                    for location in path.vertices:  # location: Vector
-                        chunk.commands.append(MoveCommand(location, self.get_speed()))
-                        last_location = location
-
-                    chunk.commands.append(ToolOffCommand())
-                chunk.commands.append(NewLayerCommand())
-                chunk.commands.append(ToolOffCommand())
+            slice_paths = [[path for path in chunk_slice.paths if path.vertices]
+                           for chunk_slice in chunk.slices]
+
+            # Moving over from the previous chunk happens before the first path that has vertices
+            transition_commands = []
+            if transitioning:
+                first_paths = [paths[0] for paths in slice_paths if paths]
+                if first_paths:
+                    transition_commands = self.get_path_between_points(
+                        last_location, first_paths[0][0])
+                    transitioning = False
+
+            # Every path takes a move to its start, a tool on, one move per vertex and a tool off,
+            # every slice ends with a new layer and a tool off, and the chunk begins and ends with
+            # a tool off (one is enough where these meet). Move locations are gathered as blocks
+            # and joined into one array.
+            ops = [tool_off_op]
+            location_blocks = []
+            speed_blocks = []
+
+            for paths in slice_paths:
+                for path in paths:
+                    if transition_commands:
+                        ops.extend([move_op] * len(transition_commands))
+                        location_blocks.append(np.array(
+                            [command.location[:3] for command in transition_commands]))
+                        speed_blocks.append(np.array(
+                            [command.robot_speed for command in transition_commands]))
+                        transition_commands = []
+
+                    vertices = path.vertices_array() * scale
+                    ops.append(move_op)
+                    ops.append(tool_on_op)
+                    ops.extend([move_op] * len(vertices))
+                    ops.append(tool_off_op)
+                    location_blocks.append(vertices[:1])
+                    location_blocks.append(vertices)
+                    speed_blocks.append(np.full(len(vertices) + 1, speed, dtype=np.float64))
+                    last_location = path.vertices[-1]
+
+                ops.append(new_layer_op)
+                ops.append(tool_off_op)
 
             transitioning = True
-            chunk.commands.append(ToolOffCommand())
-        
-        self.generate_frames()
+            if ops[-1] != tool_off_op:
+                ops.append(tool_off_op)
+
+            if location_blocks:
+                chunk.set_commands(np.array(ops, dtype=np.int8),
+                                   np.concatenate(location_blocks).astype(np.float64),
+                                   np.concatenate(speed_blocks).astype(np.float64))
+            else:
+                chunk.set_commands(np.array(ops, dtype=np.int8),
+                                   np.empty((0, 3)), np.empty(0))
+
+    @staticmethod
+    def generate_robot_frames(robots: List['Robot']):
+        """
+        Generates the ChunkFrames for every chunk of every robot in ``robots``, once their
+        commands have been generated by :func:`~am3.robot.Robot.generate_visualization`.
+        \n
+        The timing of every move needs no Blender data, so it is worked out for all the robots
+        together by :func:`~am3.util.SimulatorMath.split_robot_moves_into_frames`, which can
+        spread the robots over worker processes. The frames and their materials are then built
+        here, on the main thread, by :func:`~am3.robot.Robot.generate_frames`.
 
-    def generate_frames(self):
+        :param robots: the robots to generate frames for
+        :type robots: List[Robot]
+        """
+
+        robot_frames = SimulatorMath.split_robot_moves_into_frames(
+            [robot.chunks for robot in robots], [robot.get_location() for robot in robots],
+            1 / am3.settings.FRAMES_PER_SECOND)
+
+        for (robot, chunk_frames) in zip(robots, robot_frames):
+            robot.generate_frames(chunk_frames)
+
+    def generate_frames(self, chunk_frames: List[Tuple[List[int], List[Vector]]] = None):
         """
         Generates the ChunkFrames for every chunk belonging to this robot.
         \n
         The number of frames needed to simulate a chunk will relate to ``self.get_speed()``
         and the ``am3.settings.FRAMES_PER_SECOND`` variable.
+
+        :param chunk_frames: the frame timings of each chunk, as computed for this robot by
+            :func:`~am3.util.SimulatorMath.split_robot_moves_into_frames`. They are computed here
+            when not given.
+        :type chunk_frames: List[Tuple[List[int], List[Vector]]]
         """
 
-        for chunk in self.chunks:
+        tool_on_op = ToolOnCommand.OP
+        tool_off_op = ToolOffCommand.OP
+        new_layer_op = NewLayerCommand.OP
+        move_op = MoveCommand.OP
+
+        # The timing of every move is worked out up front; the loop below then only has to
+        # attach each frame's location and material to the right move
+        if chunk_frames is None:
+            chunk_frames = SimulatorMath.split_robot_moves_into_frames(
+                [self.chunks], [self.get_location()], 1 / am3.settings.FRAMES_PER_SECOND)[0]
+
+        for (chunk, (frame_moves, frame_locations)) in zip(self.chunks, chunk_frames):
             chunk.frame_data = [ChunkFrame(self.get_location(), None)]
 
             tool_on = False
             layer = 1
 
-            accumulated_time = 0
             accumulated_extruder_path = []
 
             last_location = self.get_location()
-            current_command = 0
 
             printed_objects = []
-            time_step = 1 / am3.settings.FRAMES_PER_SECOND
 
-            current_frame = 0
+            next_frame = 0
+            move_index = 0
+            move_points = [Vector(location) for location in chunk.move_locations.tolist()]
 
-            while current_command < len(chunk.commands):
-                command = chunk.commands[current_command]
-                command_increment = 1
+            for op in chunk.command_ops.tolist():
 
                 # Tool On Command
-                if isinstance(command, ToolOnCommand):
+                if op == tool_on_op:
                     if not tool_on:
                         tool_on = True
                         accumulated_extruder_path = [last_location]
 
                 # Tool Off Command
-                elif isinstance(command, ToolOffCommand):
+                elif op == tool_off_op:
                     if tool_on:
                         tool_on = False
                         accumulated_extruder_path.append(last_location)
@@ -427,31 +563,16 @@ class Robot:
                         accumulated_extruder_path = []
 
                 # New Layer Command
-                elif isinstance(command, NewLayerCommand):
+                elif op == new_layer_op:
                     layer += 1
 
-                # Move Command - if command can be completed before the frame finishes, go ahead and
-                # add it. Otherwise, only complete part of the command, using linear interpolation
-                elif isinstance(command, MoveCommand):
-                    time_to_complete = command.calculate_time(last_location)
-
-                    if accumulated_time + time_to_complete < time_step:
-                        accumulated_time += time_to_complete
+                # Move Command - every frame that ends part way through this move closes off the
+                # material printed so far, then the move is completed within the current frame
+                elif op == move_op:
+                    while next_frame < len(frame_moves) and frame_moves[next_frame] == move_index:
                         if tool_on:
-                            accumulated_extruder_path.append(command.location)
-                        last_location = command.location
-                    else:
-                        percent_of_path_to_complete = (
-                            time_step - accumulated_time) / time_to_complete
-
-                        next_location = SimulatorMath.linear_interpolation(
-                            last_location, command.location, percent_of_path_to_complete)
-
-                        accumulated_time = 0
-
-                        if tool_on:
-                            accumulated_extruder_path.append(next_location)
-                        last_location = next_location
+                            accumulated_extruder_path.append(frame_locations[next_frame])
+                        last_location = frame_locations[next_frame]
                         printed_objects.append(
                             Material(accumulated_extruder_path, chunk.color)
                         )
@@ -459,10 +580,12 @@ class Robot:
                         printed_objects = []
                         accumulated_extruder_path = [last_location]
 
-                        current_frame += 1
-                        command_increment = 0
+                        next_frame += 1
 
-                current_command += command_increment
+                    last_location = move_points[move_index]
+                    if tool_on:
+                        accumulated_extruder_path.append(last_location)
+                    move_index += 1
 
             if printed_objects:
                 chunk.frame_data.append(ChunkFrame(last_location, printed_objects))
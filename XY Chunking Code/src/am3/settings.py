@@ -35,10 +35,41 @@ impact any of the chunking, slicing, or simulating processes.
 :type: float
 """
 
+ASSIGN_CHUNK_METADATA = True
+"""
+Whether the chunker should give each chunk a display color and a ``Robot {} Chunk {}`` name.
+This metadata is only used for visualization, so headless batch runs can set this to ``False``
+to skip the work. Chunks that are not colored are printed with the default white material.
+
+:type: bool
+"""
+
+SIMULATOR_PROCESSES = 1
+"""
+The number of worker processes used to work out the frame timings of the robots, with each robot
+handled by a single worker. Workers are forked from the running Blender, so this only has an
+effect on platforms that support ``fork`` (i.e. not Windows), and is best left at ``1`` unless
+Blender is running in background mode.
+
+:type: int
+"""
+
+SLICER_PROCESSES = 1
+"""
+The number of worker processes the slicer uses to fill the layers of a chunk. Workers are forked
+from the running Blender, so this only has an effect on platforms that support ``fork`` (i.e.
+not Windows), and is best left at ``1`` unless Blender is running in background mode.
+
+:type: int
+"""
+
 def set_settings(model_scale: float = 1,
                  frames_per_second: float = 30,
                  slice_thickness: float = 0.5,
-                 extrusion_diameter: float = 0.25):
+                 extrusion_diameter: float = 0.25,
+                 assign_chunk_metadata: bool = True,
+                 simulator_processes: int = 1,
+                 slicer_processes: int = 1):
     """
     Sets the global settings to the values suppplied in the parameters to this function.
 
@@ -51,14 +82,27 @@ def set_settings(model_scale: float = 1,
     :param extrusion_diameter: corresponds to `~am3.settings.EXTRUSION_DIMATER`
         (default ``0.25``)
     :type extrusion_diameter: float
+    :param assign_chunk_metadata: corresponds to `~am3.settings.ASSIGN_CHUNK_METADATA`
+        (default ``True``)
+    :type assign_chunk_metadata: bool
+    :param simulator_processes: corresponds to `~am3.settings.SIMULATOR_PROCESSES` (default ``1``)
+    :type simulator_processes: int
+    :param slicer_processes: corresponds to `~am3.settings.SLICER_PROCESSES` (default ``1``)
+    :type slicer_processes: int
     """
 
     global MODEL_SCALE
     global FRAMES_PER_SECOND
     global SLICE_THICKNESS
     global EXTRUSION_DIAMETER
+    global ASSIGN_CHUNK_METADATA
+    global SIMULATOR_PROCESSES
+    global SLICER_PROCESSES
 
     MODEL_SCALE = model_scale
     FRAMES_PER_SECOND = frames_per_second
     SLICE_THICKNESS = slice_thickness
     EXTRUSION_DIAMETER = extrusion_diameter
+    ASSIGN_CHUNK_METADATA = assign_chunk_metadata
+    SIMULATOR_PROCESSES = simulator_processes
+    SLICER_PROCESSES = slicer_processes
@@ -3,13 +3,20 @@ This module contains a single class, :class:`~am3.simulator.material.Material`,
 a piece of material in the scene.
 """
 
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 import bpy
+import numpy as np
 import am3
 
 from mathutils import Vector
 
+_material_cache = {}
+"""
+Blender materials already fetched/generated by
+:func:`~am3.simulator.material.Material.get_material`, keyed by the color they were requested
+with (packed ``int`` or RGB tuple).
+"""
 
 class Material:
     """
@@ -40,45 +47,69 @@ class Material:
     :type: bpy.types.Object
     """
 
-    def __init__(self, points: List[Vector], color: Tuple[int, int, int] = (0, 0, 0)):
+    _cyclic = False
+    """
+    Whether the first and last points of ``points`` are the same, computed once on
+    initialization. See :func:`~am3.simulator.material.Material.ends_meet`.
+
+    :type: bool
+    """
+
+    def __init__(self, points: Union[List[Vector], np.ndarray], color: Union[int, Tuple[int, int, int]] = (0, 0, 0)):
         """
         Initialize a Material given a list of points, any unique number, and an RGB color.
-        This color should be of the form ``(r: int, g: int, b: int)``, where
+        This color should be of the form ``(r: int, g: int, b: int)``, or packed into a single
+        ``int`` as ``0xRRGGBB``, where
 
         .. math::
             r, g, b \\in \\mathbb{Z} : r, g, b \\in [0, 255]
 
-        :param points: a list of Vectors, defining the path of this Material
-        :type points: List[Vector]
+        :param points: a list of Vectors (or an ``(n, 3)`` array), defining the path of this
+            Material
+        :type points: Union[List[Vector], np.ndarray]
         :param number: a (hopefully) unique number for naming this extruded path
         :type number: int
         :param color: an RGB color value for this material (default ``(0, 0, 0)``)
-        :type color: Tuple[int, int, int]
+        :type color: Union[int, Tuple[int, int, int]]
         """
 
         self.points = points
+        self._cyclic = len(points) > 0 and tuple(points[0]) == tuple(points[-1])
         self.material = self.get_material(color)
         self.model = self.create_model()
 
-    def get_material(self, color: Tuple[int, int, int]) -> object:
+    def get_material(self, color: Union[int, Tuple[int, int, int]]) -> object:
         """
         Gets/generates the material object stored in the current ``.blend`` file. If it does not 
         exist, it is generated on the spot and stored for later retrieval.
 
-        :param color: the color for this material
-        :type color: Tuple[int, int, int]
+        :param color: the color for this material, either an RGB tuple or packed as ``0xRRGGBB``
+        :type color: Union[int, Tuple[int, int, int]]
         :return: the Blender material that was fetched/generated
         """
 
+        key = color if isinstance(color, int) else tuple(color)
+        material = _material_cache.get(key)
+        if material is not None:
+            try:
+                material.name  # raises if the material was removed from the .blend file
+                return material
+            except ReferenceError:
+                del _material_cache[key]
+
+        if isinstance(color, int):
+            color = ((color >> 16) & 0xFF, (color >> 8) & 0xFF, color & 0xFF)
+
         material_name = "am3.simulator.material.Material.material {0} {1} {2}".format(
             color[0], color[1], color[2])
-        if material_name in bpy.data.materials:  # fetch existing material
-            return bpy.data.materials[material_name]
-        
-        # Material doesn't exist, go ahead and make a new one
-        normalized_color = (color[0] / 256, color[1] / 256, color[2] / 256)
-        material = bpy.data.materials.new(name=material_name)
-        material.diffuse_color = normalized_color
+        material = bpy.data.materials.get(material_name)  # fetch existing material
+        if material is None:
+            # Material doesn't exist, go ahead and make a new one
+            normalized_color = (color[0] / 256, color[1] / 256, color[2] / 256)
+            material = bpy.data.materials.new(name=material_name)
+            material.diffuse_color = normalized_color
+
+        _material_cache[key] = material
         return material
 
     def create_model(self) -> object:
@@ -133,34 +164,32 @@ class Material:
         :rtype: bool
         """
 
-        if not self.points:
-            return False
-        return self.points[0] == self.points[-1]
+        return self._cyclic
 
-    def vertices_to_points(self, vertices: List[Vector]) -> List[float]:
+    def vertices_to_points(self, vertices: List[Vector]) -> np.ndarray:
         """
-        Returns a pure Python List representation of the ``vertices`` parameter. Blender has an
+        Returns a flat array representation of the ``vertices`` parameter. Blender has an
         interesting way of storing the points in a Bezier path in the scene (the Blender object
-        used to visualize printed material). It requires a List of floats, where every 4 elements
-        describe a single point in the path. The result should look like the following::
+        used to visualize printed material). It requires a flat sequence of floats, where every 4
+        elements describe a single point in the path. The result should look like the following::
 
             v1 = Vector((1.0, 2.0, 3.0))
             v2 = Vector((4.0, 5.0, 6.0))
             points = vertices_to_points([v1, v2])
-            print(points) # prints \"[1.0, 2.0, 3.0, 0, 4.0, 5.0, 6.0, 0]\"
+            print(points) # prints \"[1. 2. 3. 0. 4. 5. 6. 0.]\"
 
         :param vertices: a list of Vectors to convert
         :type vertices: List[Vector]
-        :return: a list of floats, effectively flat-mapping the input
-        :rtype: List[float]
+        :return: a contiguous ``float32`` array, effectively flat-mapping the input
+        :rtype: np.ndarray
         """
 
-        vertices_array = []
-        for vertex in vertices:
-            points = [vertex[0], vertex[1], vertex[2]]
-            vertices_array += points
-            vertices_array.append(0)
-        return vertices_array
+        # float32 matches the storage of spline point coordinates, so foreach_set can copy the
+        # buffer directly instead of converting each element
+        vertices_array = np.zeros((len(vertices), 4), dtype=np.float32)
+        if len(vertices):
+            vertices_array[:, :3] = np.asarray(vertices, dtype=np.float32)[:, :3]
+        return vertices_array.ravel()
 
     def set_hidden(self, hidden: bool):
         """
@@ -175,10 +204,43 @@ class Material:
             self.model.hide = hidden
             self.model.hide_render = hidden
 
-    def set_keyframe(self):
+    def set_action(self, action: object):
         """
-        Inserts a keyframe at the current frame (as determined by bpy.context.scene) keeping track
-        of this object's "hidden" value at the current frame
+        Animates the Blender model representing this Material with ``action``, such as one made
+        by :func:`~am3.simulator.material.Material.create_visibility_action`.
+
+        :param action: the action to animate this Material's model with
+        :type action: bpy.types.Action
+        """
+
+        animation_data = self.model.animation_data or self.model.animation_data_create()
+        animation_data.action = action
+
+    @staticmethod
+    def create_visibility_action(frame: int) -> object:
         """
-        self.model.keyframe_insert("hide")
-        self.model.keyframe_insert("hide_render")
+        Creates an action that keeps an object hidden from frame 0 until ``frame``, where it
+        becomes visible. This matches keying the object's ``hide`` and ``hide_render`` values
+        hidden on frame 0 and visible on ``frame``. Every Material that appears on the same frame
+        can share one action, instead of each inserting its own keys.
+
+        :param frame: the frame on which the object appears
+        :type frame: int
+        :return: the new action
+        :rtype: bpy.types.Action
+        """
+
+        if frame == 0:
+            keys = [0, 0]
+        else:
+            keys = [0, 1, frame, 0]
+
+        action = bpy.data.actions.new(name="Extrusion Visibility {}".format(frame))
+        for data_path in ("hide", "hide_render"):
+            fcurve = action.fcurves.new(data_path)
+            fcurve.keyframe_points.add(len(keys) // 2)
+            fcurve.keyframe_points.foreach_set("co", keys)
+            # Constant interpolation (0), as Blender uses when keying a boolean property
+            fcurve.keyframe_points.foreach_set("interpolation", [0] * (len(keys) // 2))
+            fcurve.update()
+        return action
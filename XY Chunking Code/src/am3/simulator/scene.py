@@ -6,6 +6,7 @@ and doing rudimentary operations such as importing the Robot model and resetting
 
 import bpy
 import json
+import mmap
 import os
 import time
 
@@ -13,9 +14,22 @@ from typing import List, Union, Tuple, Dict
 from am3.util import SimulatorMath
 from am3.robot import ChunkFrame, Robot, RobotParameters
 from am3.simulator.material import Material
-from am3.simulator.simulation import Simulation
+from am3.simulator.simulation import Simulation, SimulationFrame, SimulationInitialization
+from am3.simulator.simulation import ijson, orjson
 from mathutils import Vector
 
+# Blender only ships the standard library json module, but a faster C parser is used for loading
+# simulation files when one has been installed into Blender's Python. Writing them is done by
+# Simulation.dump, which uses orjson but not ujson, since ujson rounds floats to fewer digits
+# than the stdlib encoder.
+if orjson is not None:
+    fast_json = orjson
+else:
+    try:
+        import ujson as fast_json
+    except ImportError:
+        fast_json = None
+
 
 class SimulatorScene:
     """
@@ -25,22 +39,6 @@ class SimulatorScene:
     :func:`~am3.simulator.scene.SimulatorScene.simulate`.
     """
 
-    @staticmethod
-    def still_running(finished_robots: List[bool]) -> bool:
-        """
-        Checks if the simulation is finished (i.e., are any robots `not` finished?).
-
-        :param finished_robots: a list of booleans indexed by robot number. The value at a
-            given index should indicate if the robot is finished or not.
-        :type finished_robots: List[bool]
-        :return: whether or not all robots are finished
-        :rtype: bool
-        """
-
-        for value in finished_robots:
-            if value is False:
-                return True
-
     @staticmethod
     def write_simulation_to_file(simulation: Simulation, indent: bool=False):
         """
@@ -62,11 +60,7 @@ class SimulatorScene:
 
         timestamp = int(time.time())
         filename = os.path.join(bpy.path.abspath('//'), 'simulation_data_{}.json'.format(timestamp))
-        with open(filename, 'w') as outfile:
-            if indent:
-                outfile.write(json.dumps(simulation.serialize(), indent=2))
-            else:
-                outfile.write(json.dumps(simulation.serialize()))
+        simulation.dump(filename, indent)
 
         print('File written to {}'.format(filename))
 
@@ -89,7 +83,7 @@ class SimulatorScene:
               will contribute to the current frame. Once each robot has contributed one chunk
               frame to the current simulation frame, the simulation frame is animated and a new
               frame is created.
-            * Once all robots have been marked as finished (in ``finished_robots``), the
+            * Once every robot has been removed from ``active_robots`` (i.e. finished), the
               simulation ends.
 
         :param robots: a List of initialized robots. These should be in their start positions,
@@ -101,14 +95,14 @@ class SimulatorScene:
         :type write_simulation_file: bool
         """
 
-        finished_robots = []
         finished_chunks = []
         current_chunks = []
         current_data_indices = []
 
+        # Robot locations are recorded as the simulation runs, and written into their animation in
+        # one batch per F-Curve once it has finished
         for robot in robots:
-            robot.set_keyframe()
-            finished_robots.append(False)
+            robot.record_keyframe(bpy.context.scene.frame_current)
             current_chunks.append(0)
             current_data_indices.append(0)
 
@@ -131,28 +125,33 @@ class SimulatorScene:
                     if chunk_frame.has_material():
                         for material in chunk_frame.materials:
                             material.set_hidden(True)
-                            material.set_keyframe()
 
-        while SimulatorScene.still_running(finished_robots):
+        # Materials are grouped by the frame they appear on, and each group is animated with one
+        # shared visibility action once the simulation has finished
+        shown_materials = {}
+
+        # Indices of robots that still have chunks to print. Finished robots are removed so
+        # later frames don't revisit them
+        active_robots = list(range(len(robots)))
+
+        while active_robots:
             if current_frame % 100 == 0:
                 print("Frame {}".format(current_frame))
 
-            scene.frame_set(current_frame - 1)
+            # Key the last locations on the previous frame directly, rather than stepping the
+            # scene back and forth (each frame_set re-evaluates the whole scene)
             for robot in robots:
                 robot.set_last_location()
-                robot.set_keyframe()
-            scene.frame_set(current_frame)
+                robot.record_keyframe(current_frame - 1)
 
             material_added = []
 
-            for i in range(0, len(robots)):
-                if finished_robots[i] is True:
-                    continue
+            for i in list(active_robots):
                 robot = robots[i]
                 current_chunk_index = current_chunks[i]
                 
                 if current_chunk_index >= len(robot.chunks):
-                    finished_robots[i] = True
+                    active_robots.remove(i)
                     continue
 
                 current_chunk = robot.chunks[current_chunk_index]
@@ -166,18 +165,18 @@ class SimulatorScene:
                     current_data_indices[i] = current_data_index
                     if current_data_index >= len(chunk_frame_data):
                         robot.set_last_location()
-                        robot.set_keyframe()
+                        robot.record_keyframe(current_frame)
 
                         current_chunks[i] += 1
 
                         if current_chunks[i] >= len(robot.chunks):
-                            finished_robots[i] = True
+                            active_robots.remove(i)
                         else:
                             next_chunk = robot.chunks[current_chunks[i]]
                             if next_chunk.is_empty():
                                 next_location = next_chunk.frame_data[1].location
                                 robot.set_location(next_location)
-                                robot.set_keyframe()
+                                robot.record_keyframe(current_frame)
                         current_data_indices[i] = 0
 
                         finished_chunks.append(current_chunk.number)
@@ -187,30 +186,46 @@ class SimulatorScene:
                         materials = frame_data.materials
 
                         robot.set_location(location)
-                        robot.set_keyframe()
+                        robot.record_keyframe(current_frame)
 
                         if materials:
+                            shown = shown_materials.setdefault(current_frame, [])
                             for material in materials:
                                 material_added.append(material)
-                                material.set_hidden(False)
-                                material.set_keyframe()
+                                shown.append(material)
 
             if write_simulation_file:
                 simulation.add_frame(robots, material_added)
                 material_added.clear()
 
+            # Nothing is keyed until the loop ends, so the scene is not stepped (and re-evaluated)
+            # on every frame; it is moved to the last frame once the animation has been written
             current_frame += 1
-            scene.frame_end = current_frame
-            scene.frame_set(current_frame)
+
+        for robot in robots:
+            robot.write_recorded_keyframes()
+
+        for (frame, materials) in shown_materials.items():
+            action = Material.create_visibility_action(frame)
+            for material in materials:
+                material.set_action(action)
 
         if write_simulation_file:
             print("Writing simulation data to file...")
             SimulatorScene.write_simulation_to_file(simulation)
         
         scene.frame_end = current_frame
+        scene.frame_set(current_frame)
         print("Finished rendering")
 
 
+_robot_meshes = {}
+"""
+The meshes of robot 0 from the last OBJ import, along with the world matrix the importer gave
+their objects, keyed by the name of the object they belong to. See :func:`~am3.simulator.scene.Initializer.restore_robot_obj`.
+"""
+
+
 class Initializer:
     """
     This class contains static methods that are all rudimentary operations performed when initializing
@@ -279,8 +294,43 @@ class Initializer:
             objects[0].name = 'Robot Printhead 0'
             objects[1].name = 'Robot Body 0' 
 
+        for obj in objects[:2]:
+            _robot_meshes[obj.name] = (obj.data, obj.matrix_world.copy())
+
         return objects
 
+    @staticmethod
+    def restore_robot_obj() -> bool:
+        """
+        Recreates the robot body and printhead objects from the meshes of an earlier
+        :func:`~am3.simulator.scene.Initializer.import_robot_obj` call, without importing the
+        OBJ file again. This only works if both meshes are still loaded (e.g. the objects were
+        deleted, but the meshes haven't been purged).
+
+        :return: ``True`` if the objects were recreated, ``False`` otherwise.
+        :rtype: bool
+        """
+
+        names = ('Robot Body 0', 'Robot Printhead 0')
+        if any(name not in _robot_meshes for name in names):
+            return False
+        try:
+            if any(_robot_meshes[name][0].name not in bpy.data.meshes for name in names):
+                return False
+        except ReferenceError:  # a mesh has been removed from the .blend file
+            return False
+
+        scene = bpy.context.scene
+        for name in names:
+            obj = bpy.data.objects.get(name)
+            if obj is None:
+                (mesh, matrix_world) = _robot_meshes[name]
+                obj = bpy.data.objects.new(name, mesh)
+                obj.matrix_world = matrix_world
+            if obj.name not in scene.objects:
+                scene.objects.link(obj)
+        return True
+
     @staticmethod
     def import_robots(count: int, parameters: RobotParameters = None) -> List[Robot]:
         """
@@ -290,7 +340,7 @@ class Initializer:
         """
 
         Initializer.reset_scene()
-        if not Initializer.is_robot_already_imported():
+        if not Initializer.is_robot_already_imported() and not Initializer.restore_robot_obj():
             Initializer.import_robot_obj()
 
         if not parameters:
@@ -317,16 +367,63 @@ class JsonLoader:
     This class is responsible for loading a simulation from a JSON file.
     """
 
+    @staticmethod
+    def read_simulation_file(simulation_file_path: str) -> Dict:
+        """
+        Parses a simulation JSON file, with the fastest JSON parser available.
+
+        :param simulation_file_path: the file name for the JSON file
+        :type simulation_file_path: str
+        :return: the parsed simulation data
+        :rtype: Dict
+        """
+
+        if orjson is not None and os.path.getsize(simulation_file_path) > 0:
+            # orjson parses straight out of a read-only mapping of the file, so the file's bytes
+            # are never copied into a Python buffer first
+            with open(simulation_file_path, 'rb') as json_file, \
+                    mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                    memoryview(mapped) as view:
+                simulation_data = orjson.loads(view)
+        elif fast_json is not None:
+            # Both parsers accept the raw bytes, skipping the decode to str. The buffer is sized
+            # from the file up front and filled in place, so reading never reallocates
+            buffer = bytearray(os.path.getsize(simulation_file_path))
+            total = 0
+            with open(simulation_file_path, 'rb', buffering=0) as json_file, \
+                    memoryview(buffer) as view:
+                while total < len(buffer):
+                    count = json_file.readinto(view[total:])
+                    if not count:
+                        break
+                    total += count
+            del buffer[total:]  # in case the file shrank while it was being read
+
+            # orjson parses the bytearray directly, ujson needs bytes
+            if fast_json.__name__ != 'orjson':
+                buffer = bytes(buffer)
+            simulation_data = fast_json.loads(buffer)
+        else:
+            # Blender's Python 3.5 json module only parses str, so the file stays in text mode, but
+            # with a large buffer and a fixed codec instead of the locale default
+            with open(simulation_file_path, 'r', buffering=2**20, encoding='utf-8') as json_file:
+                simulation_data = json.load(json_file)
+
+        return simulation_data
+
     @staticmethod
     def load_from_simulation_file(
             simulation_file_path: str,
-            material_color: Tuple[int, int, int] = (255, 255, 255)) -> bool:
+            material_color: Union[int, Tuple[int, int, int]] = (255, 255, 255)) -> bool:
         """
         Does the heavy lifting of loading a previously-generated simulation from a JSON file and
         setting the Blender scene to animate the data in that file.
 
         :param simulation_file_path: the file name for the JSON file
         :type simulation_file_path: str
+        :param material_color: the RGB color of the loaded material, as a tuple or packed as
+            ``0xRRGGBB`` (default ``(255, 255, 255)``)
+        :type material_color: Union[int, Tuple[int, int, int]]
         :return: whether or not the loading was successful
         :rtype: bool
         """
@@ -334,50 +431,150 @@ class JsonLoader:
         if not simulation_file_path.endswith('.json'):
             return False
 
-        with open(simulation_file_path, 'r') as json_file:
-            simulation_data = json.load(json_file)
+        # Stream the file frame by frame when ijson is available, so the whole file never has to
+        # be held in memory
+        if ijson is not None:
+            return JsonLoader.stream_from_simulation_file(simulation_file_path,
+                                                          material_color=material_color)
 
-        simulation = Simulation(data=simulation_data)
-        robots = Initializer.import_robots(simulation.robot_count())
+        simulation_data = JsonLoader.read_simulation_file(simulation_file_path)
+        return JsonLoader.load_from_dict(simulation_data, material_color=material_color)
 
-        scene = bpy.context.scene
-        scene.frame_set(0)
-        scene.frame_end = simulation.frame_count()
+    @staticmethod
+    def stream_from_simulation_file(
+            simulation_file_path: str,
+            material_color: Union[int, Tuple[int, int, int]] = (255, 255, 255)) -> bool:
+        """
+        Loads a simulation like :func:`~am3.simulator.scene.JsonLoader.load_from_simulation_file`,
+        but parses the file incrementally with ``ijson``, applying each frame to the scene as soon
+        as it is read. Memory use stays proportional to one frame rather than the whole file.
+
+        :param simulation_file_path: the file name for the JSON file
+        :type simulation_file_path: str
+        :param material_color: the RGB color of the loaded material, as a tuple or packed as
+            ``0xRRGGBB`` (default ``(255, 255, 255)``)
+        :type material_color: Union[int, Tuple[int, int, int]]
+        :return: whether or not the loading was successful
+        :rtype: bool
+        """
+
+        init = Simulation.stream_init(simulation_file_path)
+        if init is None:
+            return False
+
+        robots = JsonLoader.initialize_robots(init)
 
-        print("WILL RENDER {} FRAMES".format(simulation.frame_count()))
+        frame_count = 0
+        for frame in Simulation.stream_frames(simulation_file_path):
+            JsonLoader.apply_frame(robots, frame_count, frame, material_color)
+            frame_count += 1
 
-        for robot, init_robot in zip(robots, simulation.init.robots):
+        JsonLoader.finish_animation(robots, frame_count)
+        return True
+
+    @staticmethod
+    def initialize_robots(init: SimulationInitialization) -> List[Robot]:
+        """
+        Imports the robots described by ``init``, and records keyframes for their initial
+        positions at frame ``0``, which is left as the current frame. Recorded keyframes are
+        written by :func:`~am3.simulator.scene.JsonLoader.finish_animation`.
+
+        :param init: the initialization data of a simulation
+        :type init: SimulationInitialization
+        :return: the robots, in order of their robot number
+        :rtype: List[Robot]
+        """
+
+        robots = Initializer.import_robots(len(init.robots))
+
+        bpy.context.scene.frame_set(0)
+
+        for robot, init_robot in zip(robots, init.robots):
             robot.set_location(init_robot.location)
             robot.set_rotation(init_robot.rotation)
-            robot.set_keyframe()
+            robot.record_keyframe(0)
 
-        all_material = []
-        for i, frame in enumerate(simulation.frames):
-            if i % 20 == 0:
-                print("CREATING MATERIAL IN FRAME {}".format(i))
+        return robots
 
-            materials = [Material(material.points, material_color) for material in frame.materials]
-            all_material.append(materials)
-            for material in materials:
-                material.set_hidden(True)
-                material.set_keyframe()
+    @staticmethod
+    def apply_frame(robots: List[Robot],
+                    frame_number: int,
+                    frame: SimulationFrame,
+                    material_color: Union[int, Tuple[int, int, int]]):
+        """
+        Animates a single simulation frame: the frame's material appears and the robots take their
+        new positions on frame ``frame_number + 1``. The material is created and given its
+        visibility action straight away, so no Material objects outlive their frame. The robots
+        only record their keyframes, for :func:`~am3.simulator.scene.JsonLoader.finish_animation`
+        to write once every frame has been applied.
+
+        :param robots: the robots of the simulation, in order of their robot number
+        :type robots: List[Robot]
+        :param frame_number: the index of ``frame`` in the simulation
+        :type frame_number: int
+        :param frame: the frame to animate
+        :type frame: SimulationFrame
+        :param material_color: the RGB color of the material, as a tuple or packed as ``0xRRGGBB``
+        :type material_color: Union[int, Tuple[int, int, int]]
+        """
+
+        if frame_number % 50 == 0:
+            print("WORKING ON FRAME {}".format(frame_number))
+
+        if frame.materials:
+            action = Material.create_visibility_action(frame_number + 1)
+            for material in frame.materials:
+                Material(material.points, material_color).set_action(action)
+
+        for robot, frame_robot in zip(robots, frame.robots):
+            robot.set_location(frame_robot.location)
+            robot.set_rotation(frame_robot.rotation)
+            robot.record_keyframe(frame_number + 1)
+
+    @staticmethod
+    def finish_animation(robots: List[Robot], frame_count: int):
+        """
+        Writes the robots' keyframes recorded by :func:`~am3.simulator.scene.JsonLoader.apply_frame`.
+        The scene is then left on its last frame.
 
-        for i, frame in enumerate(simulation.frames):
-            if i % 50 == 0:
-                print("WORKING ON FRAME {}".format(i))
+        :param robots: the robots of the simulation
+        :type robots: List[Robot]
+        :param frame_count: the number of frames in the simulation
+        :type frame_count: int
+        """
+
+        for robot in robots:
+            robot.write_recorded_keyframes()
+
+        scene = bpy.context.scene
+        scene.frame_end = frame_count
+        scene.frame_set(frame_count)
 
-            scene.frame_set(i + 1)
+    @staticmethod
+    def load_from_dict(
+            simulation_data: Dict,
+            material_color: Union[int, Tuple[int, int, int]] = (255, 255, 255)) -> bool:
+        """
+        Sets the Blender scene to animate already-parsed simulation data, as produced by
+        :func:`~am3.simulator.scene.JsonLoader.read_simulation_file`.
+
+        :param simulation_data: the parsed simulation data
+        :type simulation_data: Dict
+        :param material_color: the RGB color of the loaded material, as a tuple or packed as
+            ``0xRRGGBB`` (default ``(255, 255, 255)``)
+        :type material_color: Union[int, Tuple[int, int, int]]
+        :return: whether or not the loading was successful
+        :rtype: bool
+        """
 
-            frame_robots = frame.robots
-            frame_materials = all_material[i]
+        robots = JsonLoader.initialize_robots(SimulationInitialization(data=simulation_data['init']))
+        frames_data = simulation_data['frames']
 
-            for material in frame_materials:
-                material.set_hidden(False)
-                material.set_keyframe()
+        print("WILL RENDER {} FRAMES".format(len(frames_data)))
 
-            for robot, frame_robot in zip(robots, frame_robots):
-                robot.set_location(frame_robot.location)
-                robot.set_rotation(frame_robot.rotation)
-                robot.set_keyframe()
+        # Frames are built one at a time as they are applied, rather than as a whole Simulation
+        for i, frame_data in enumerate(frames_data):
+            JsonLoader.apply_frame(robots, i, SimulationFrame.from_data(frame_data), material_color)
 
+        JsonLoader.finish_animation(robots, len(frames_data))
         return True
@@ -2,11 +2,26 @@
 Contains classes directly related to encoding and decoding JSON Simulations.
 """
 
-from typing import List, Dict, Union, Tuple
+from typing import List, Dict, Union, Tuple, Iterator
+import json
+import numpy as np
 from am3.robot import Robot
 from am3.simulator.material import Material
 from mathutils import Vector
 
+# ijson lets a simulation file be read one frame at a time instead of parsed whole. It uses the
+# fastest backend installed (the yajl2_c extension, when available).
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson writes a whole simulation in one pass, numpy point arrays included
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 def describe_point(point: Union[Vector, Tuple[float, float, float]]) -> List[float]:
     """
@@ -23,32 +38,46 @@ def describe_point(point: Union[Vector, Tuple[float, float, float]]) -> List[flo
     return [round(point[0], 6), round(point[1], 6), round(point[2], 6)]
 
 
-class SimulationRobot:
-    """
-    Represents a single Robot as it should be represented in a simulation, as encoded by a JSON
-    Simulation. The only necessary information to store is the robot's number, location, and rotation.
+def order_by_number(robots: List['SimulationRobot']) -> List['SimulationRobot']:
     """
-
-    number = 0
+    Returns ``robots`` ordered by robot number. Robots are normally numbered ``0`` to ``n - 1``,
+    so each one is placed directly at the index of its number; the list is only sorted if the
+    numbers are not exactly that range.
+
+    :param robots: the robots to order
+    :type robots: List[SimulationRobot]
+    :return: the robots, ordered by number
+    :rtype: List[SimulationRobot]
     """
-    The number of this Robot
 
-    :type: int
-    """
+    ordered = [None] * len(robots)
+    for robot in robots:
+        number = robot.number
+        if not 0 <= number < len(ordered) or ordered[number] is not None:
+            return sorted(robots, key=lambda x: x.number)
+        ordered[number] = robot
+    return ordered
 
-    location = None
-    """
-    The location of this Robot, either at initialization or at a specific frame
 
-    :type: List[float] or Vector
+class SimulationRobot:
     """
-
-    rotation = 0
+    Represents a single Robot as it should be represented in a simulation, as encoded by a JSON
+    Simulation. The only necessary information to store is the robot's number, location, and rotation.
+    \n
+    One of these is made per robot per frame, so the class uses ``__slots__`` rather than an
+    instance ``__dict__``.
+
+    :ivar number: The number of this Robot
+    :vartype number: int
+    :ivar location: The location of this Robot, either at initialization or at a specific frame
+    :vartype location: List[float] or Vector
+    :ivar rotation: The rotation of this Robot, either at initialization or at a specific frame
+    :vartype rotation: float
     """
-    The rotation of this Robot, either at initialization or at a specific frame
 
-    :type: float
-    """
+    # _rounded_location and _rounded_rotation hold the values written by serialize, computed once
+    # when the robot is captured from a Robot, since those are serialized right after being captured
+    __slots__ = ('number', 'location', 'rotation', '_rounded_location', '_rounded_rotation')
 
     def __init__(self, robot: Robot = None, data: Dict = None):
         if data is None:
@@ -57,10 +86,34 @@ class SimulationRobot:
             self.number = robot.get_number()
             self.location = describe_point(robot.get_location())
             self.rotation = robot.get_rotation()
+            self._rounded_location = self.location
+            self._rounded_rotation = round(self.rotation, 6)
         elif data is not None:
             self.number = data['n']
             self.location = Vector(tuple(data['v']))
             self.rotation = data['r']
+            self._rounded_location = None
+            self._rounded_rotation = None
+
+    @classmethod
+    def from_data(cls, data: Dict) -> 'SimulationRobot':
+        """
+        Builds a SimulationRobot from its JSON representation, like ``SimulationRobot(data=data)``
+        without the checks of the general constructor. Used when loading simulations.
+
+        :param data: the robot's ``n``, ``v`` and ``r`` values
+        :type data: Dict
+        :return: the SimulationRobot
+        :rtype: SimulationRobot
+        """
+
+        robot = cls.__new__(cls)
+        robot.number = data['n']
+        robot.location = Vector(data['v'])
+        robot.rotation = data['r']
+        robot._rounded_location = None
+        robot._rounded_rotation = None
+        return robot
 
     def serialize(self) -> Dict:
         """
@@ -72,10 +125,14 @@ class SimulationRobot:
         :rtype: List[Dict[str, object]]
         """
 
+        if self._rounded_location is None:
+            self._rounded_location = describe_point(self.location)
+            self._rounded_rotation = round(self.rotation, 6)
+
         return {
             'n': self.number,  # n = robot number
-            'v': describe_point(self.location), # v = robot position
-            'r': round(self.rotation, 6) # r = rotation in radians
+            'v': self._rounded_location, # v = robot position
+            'r': self._rounded_rotation # r = rotation in radians
         }
         
 
@@ -97,9 +154,9 @@ class SimulationInitialization:
             assert robots is not None, 'You must supply either a List of Robots or a data object'
             self.robots = [SimulationRobot(robot=robot) for robot in robots]
         else:
-            self.robots = [SimulationRobot(data=robot) for robot in data['machines']]
+            self.robots = [SimulationRobot.from_data(robot) for robot in data['machines']]
 
-        self.robots.sort(key=lambda x: x.number)
+        self.robots = order_by_number(self.robots)
 
     def serialize(self):
         return {
@@ -111,55 +168,71 @@ class SimulationMaterial:
     """
     Represents a single piece of Material as encoded by a JSON file. Each piece of material is, in
     essence, a list of points only.
-    """
 
-    points = []
+    :ivar points: The points representing this material, as an ``(n, 3)`` array of (x, y, z)
+        coordinates. They are rounded to 6 decimal places when stored, so they can be serialized
+        as they are.
+    :vartype points: numpy.ndarray
     """
-    The points representing this material. Each point is a ``List[float]`` with 3 items (x, y, z)
-    coordinates.
 
-    :type: List[List[float]]
-    """
+    __slots__ = ('points',)
 
     def __init__(self, material: Material = None, data: Dict = None):
         if data is None:
             assert material != None, 'You must supply a Material object if not supplying raw data'
-            self.points = material.points
+            points = material.points
         else:
-            self.points = data
+            points = data
+        self.points = np.round(np.array(points, dtype=np.float64).reshape(-1, 3), 6)
 
-    def serialize(self):
+    @classmethod
+    def from_data(cls, data: List[List[float]]) -> 'SimulationMaterial':
+        """
+        Builds a SimulationMaterial from its JSON representation, like
+        ``SimulationMaterial(data=data)``. Used when loading simulations.
+
+        :param data: the material's points
+        :type data: List[List[float]]
+        :return: the SimulationMaterial
+        :rtype: SimulationMaterial
+        """
+
+        material = cls.__new__(cls)
+        material.points = np.array(data, dtype=np.float64).reshape(-1, 3)
+        np.round(material.points, 6, out=material.points)
+        return material
+
+    def serialize(self, numpy_arrays: bool = False):
         """
         Returns a pure Python representation of this SimulationMaterial. The only information needed
         from a Material object is the path (i.e., the list of points in the object). The result is
         a list of points, which are themselves each represented as a list of floats.
 
+        :param numpy_arrays: return the rounded points as an ``(n, 3)`` array instead of lists,
+            for writers that serialize arrays directly (see :func:`~am3.simulator.simulation.Simulation.dump`)
+        :type numpy_arrays: bool
         :return: a JSON-ready representation of the Material object
-        :rtype: List[List[float]]
+        :rtype: List[List[float]] or numpy.ndarray
         """
-        return [describe_point(point) for point in self.points]
+        if numpy_arrays:
+            return self.points
+        return self.points.tolist()
 
 
 class SimulationFrame:
     """
     Represents a single frame in a JSON Simulation. Each frame needs to store the robot position of
     every robot, and all the material placed only in that frame.
-    """
 
-    robots = None
+    :ivar robots: An array of the 'robots' that need to be moved in this frame. Each robot simply
+        stores its number, location, and rotation
+    :vartype robots: List[SimulationRobot]
+    :ivar materials: An array of all the material placed in this frame. Each piece of material is
+        a list of points
+    :vartype materials: List[SimulationMaterial]
     """
-    An array of the 'robots' that need to be moved in this frame. Each robot simply stores
-    its number, location, and rotation
 
-    :type: List[SimulationRobot]
-    """
-
-    materials = None
-    """
-    An array of all the material placed in this frame. Each piece of material is a list of points
-
-    :type: List[List[List[float]]]
-    """
+    __slots__ = ('robots', 'materials')
 
     def __init__(self,
                  robots: List[Robot] = None,
@@ -171,23 +244,44 @@ class SimulationFrame:
             self.robots = [SimulationRobot(robot=robot) for robot in robots]
             self.materials = [SimulationMaterial(material=material) for material in materials]
         else:
-            self.robots = [SimulationRobot(data=robot_data) for robot_data in data['machines']]
-            self.materials = [SimulationMaterial(data=material_data) for material_data in data['printeds']]
+            self.robots = [SimulationRobot.from_data(robot_data) for robot_data in data['machines']]
+            self.materials = [SimulationMaterial.from_data(material_data) for material_data in data['printeds']]
 
-        self.robots.sort(key=lambda x: x.number)
+        self.robots = order_by_number(self.robots)
 
-    def serialize(self):
+    @classmethod
+    def from_data(cls, data: Dict) -> 'SimulationFrame':
+        """
+        Builds a SimulationFrame from its JSON representation, like ``SimulationFrame(data=data)``
+        without the checks of the general constructor. Used when loading simulations.
+
+        :param data: the frame's ``machines`` and ``printeds`` values
+        :type data: Dict
+        :return: the SimulationFrame
+        :rtype: SimulationFrame
+        """
+
+        frame = cls.__new__(cls)
+        robot_from_data = SimulationRobot.from_data
+        material_from_data = SimulationMaterial.from_data
+        frame.robots = order_by_number([robot_from_data(robot) for robot in data['machines']])
+        frame.materials = [material_from_data(material) for material in data['printeds']]
+        return frame
+
+    def serialize(self, numpy_arrays: bool = False):
         """
         Returns a pure Python representation of a scene state. The only information needed for
         a \"scene state\" are the List of robots and the List of Material objects extruded during
         the most recent frame.
 
+        :param numpy_arrays: see :func:`~am3.simulator.simulation.SimulationMaterial.serialize`
+        :type numpy_arrays: bool
         :return: a JSON-ready representation of this frame
         :rtype: Dict[str, object]
         """
         return {
             'machines': [robot.serialize() for robot in self.robots],
-            'printeds': [material.serialize() for material in self.materials]
+            'printeds': [material.serialize(numpy_arrays) for material in self.materials]
         }
 
 class Simulation:
@@ -220,7 +314,7 @@ class Simulation:
             self.frames = []
         else:
             self.init = SimulationInitialization(data=data['init'])
-            self.frames = [SimulationFrame(data=frame_data) for frame_data in data['frames']]
+            self.frames = [SimulationFrame.from_data(frame_data) for frame_data in data['frames']]
 
     def add_frame(self, robots: List[Robot], materials: List[Material]):
         """
@@ -248,16 +342,99 @@ class Simulation:
         """
         return len(self.frames)
 
-    def serialize(self) -> Dict:
+    def serialize(self, numpy_arrays: bool = False) -> Dict:
         """
         Returns a pure Python (i.e. JSON-ready) representation of this ``Simulation`` object.
 
+        :param numpy_arrays: see :func:`~am3.simulator.simulation.SimulationMaterial.serialize`
+        :type numpy_arrays: bool
         :return: a JSON-ready Dict
         :rtype: Dict
         """
         return {
             'init': self.init.serialize(),
-            'frames': [frame.serialize() for frame in self.frames]
+            'frames': [frame.serialize(numpy_arrays) for frame in self.frames]
         }
 
+    def dump(self, path: str, indent: bool = False):
+        """
+        Writes this ``Simulation`` to the JSON file at ``path``. When ``orjson`` is installed, the
+        material points are handed to it as numpy arrays, so they are written without first being
+        converted to nested lists. Otherwise the standard library ``json`` module is used.
+
+        :param path: the file name to write to
+        :type path: str
+        :param indent: whether or not to indent the output JSON with whitespace
+        :type indent: bool
+        """
+
+        if orjson is not None:
+            option = orjson.OPT_SERIALIZE_NUMPY
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            with open(path, 'wb') as outfile:
+                outfile.write(orjson.dumps(self.serialize(numpy_arrays=True), option=option))
+        else:
+            with open(path, 'w') as outfile:
+                if indent:
+                    outfile.write(json.dumps(self.serialize(), indent=2))
+                else:
+                    outfile.write(json.dumps(self.serialize()))
+
+    @staticmethod
+    def stream_init(simulation_file_path: str) -> Union[SimulationInitialization, None]:
+        """
+        Reads only the ``init`` section of a simulation JSON file, using ``ijson``.
+
+        :param simulation_file_path: the file name for the JSON file
+        :type simulation_file_path: str
+        :return: the initialization data, or ``None`` if the file has none
+        :rtype: SimulationInitialization or None
+        """
+
+        # The keys of the top-level object are not ordered, so ``init`` gets its own pass
+        with open(simulation_file_path, 'rb') as json_file:
+            init_data = next(ijson.items(json_file, 'init', use_float=True), None)
+        if init_data is None:
+            return None
+        return SimulationInitialization(data=init_data)
+
+    @staticmethod
+    def stream_frames(simulation_file_path: str) -> Iterator[SimulationFrame]:
+        """
+        Yields the frames of a simulation JSON file one at a time, using ``ijson``. Only the
+        frame being built is ever parsed, so the file's raw data is never held in memory whole.
+
+        :param simulation_file_path: the file name for the JSON file
+        :type simulation_file_path: str
+        :return: the frames, in order
+        :rtype: Iterator[SimulationFrame]
+        """
+
+        with open(simulation_file_path, 'rb') as json_file:
+            for frame_data in ijson.items(json_file, 'frames.item', use_float=True):
+                yield SimulationFrame.from_data(frame_data)
+
+    @classmethod
+    def from_stream(cls, simulation_file_path: str) -> 'Simulation':
+        """
+        Builds a Simulation from a JSON file like ``Simulation(data=...)``, but parses the file
+        incrementally with ``ijson``, building each SimulationFrame as soon as its data is read.
+
+        :param simulation_file_path: the file name for the JSON file
+        :type simulation_file_path: str
+        :return: the Simulation stored in the file
+        :rtype: Simulation
+        :raises ValueError: if the file has no ``init`` section
+        """
+
+        init = cls.stream_init(simulation_file_path)
+        if init is None:
+            raise ValueError('The simulation file has no init data')
+
+        simulation = cls.__new__(cls)
+        simulation.init = init
+        simulation.frames = list(cls.stream_frames(simulation_file_path))
+        return simulation
+
     
\ No newline at end of file
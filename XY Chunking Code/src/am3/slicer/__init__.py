@@ -3,14 +3,16 @@ Contains classes common to the ``slicer`` subpackage. The only class, so far, is
 """
 
 import math
+import multiprocessing
 import bmesh
+import numpy as np
 import am3
 import am3.settings
 
 from typing import List, Dict
 from collections import defaultdict
 from am3.util import *
-from am3.slicer.geometry import LineSegment, Triangle, TriangleMesh, Plane
+from am3.slicer.geometry import LineSegment, Triangle, TriangleMesh, Plane, slice_triangles
 from am3.model import Chunk, Slice, Path
 from mathutils import Vector
 
@@ -79,29 +81,32 @@ class Slicer:
 
         boundaries = [] # keeps track of the boundary LineSegments for each layer
 
-        plane = Plane()
-        plane.setNormal(Vector((0, 0, 1))) # upward-facing normal vector
         z_height = tri_mesh.meshAABBSize()[2]
 
         n_slices = int(1 + math.floor(z_height / slice_size))
 
         z0 = tri_mesh.bottomLeftVertex[2]
 
-        # Iterate slicing planes from bottom to top
+        # Heights of the horizontal slicing planes, from bottom to top
+        heights = []
         for i in range(0, n_slices):
-            intersections = []
-
             if i == n_slices - 1: # this is the last slice, so only shift upward by 0.5 * slice_size
-                plane.setDistance(z0 + (i - 1) * slice_size + slice_size / 2)
+                heights.append(z0 + (i - 1) * slice_size + slice_size / 2)
             else:
-                plane.setDistance(z0 + i * slice_size)
-
-            for triangle in tri_mesh.mesh:
-                intersection = LineSegment()
-                if triangle.intersectPlane(plane, intersection) == 0:
-                    intersection.simplify()
-                    intersections.append(intersection)
-                
+                heights.append(z0 + i * slice_size)
+
+        # Every triangle is intersected with every plane in one call (see
+        # am3.slicer.geometry.slice_triangles), which is compiled when numba is available and
+        # vectorized with numpy otherwise
+        (segments, offsets) = slice_triangles(tri_mesh.verts, np.array(heights, dtype=np.float64))
+        # Rounding every endpoint here does what LineSegment.simplify would do to each segment,
+        # and the segments keep plain tuples rather than Vectors
+        segments = np.round(segments, 3).tolist()
+
+        for i in range(0, n_slices):
+            intersections = [LineSegment(tuple(p0), tuple(p1))
+                             for (p0, p1) in segments[offsets[i]:offsets[i + 1]]]
+
             boundaries.append(intersections)
 
         slices = Slicer.fill_boundaries(boundaries)
@@ -122,18 +127,20 @@ class Slicer:
         obj_mesh = obj.data
         tri_mesh = TriangleMesh()
 
-        for polygon in obj_mesh.polygons:
-            vertices = polygon.vertices
-            v0t = obj_mesh.vertices[vertices[0]].co
-            v1t = obj_mesh.vertices[vertices[1]].co
-            v2t = obj_mesh.vertices[vertices[2]].co
-
-            v0 = Vector((v0t[0], v0t[1], v0t[2]))
-            v1 = Vector((v1t[0], v1t[1], v1t[2]))
-            v2 = Vector((v2t[0], v2t[1], v2t[2]))
+        # The vertex coordinates and polygon corners are copied out of Blender in bulk with
+        # foreach_get. Each polygon contributes its first three vertices (chunk meshes are
+        # triangulated when they are split off the model).
+        coordinates = np.empty(len(obj_mesh.vertices) * 3, dtype=np.float32)
+        obj_mesh.vertices.foreach_get('co', coordinates)
+        coordinates = coordinates.reshape(-1, 3)
 
-            tri_mesh.append(Triangle(v0, v1, v2))
+        loop_starts = np.empty(len(obj_mesh.polygons), dtype=np.int32)
+        obj_mesh.polygons.foreach_get('loop_start', loop_starts)
+        loop_vertices = np.empty(len(obj_mesh.loops), dtype=np.int32)
+        obj_mesh.loops.foreach_get('vertex_index', loop_vertices)
 
+        corners = loop_vertices[loop_starts[:, np.newaxis] + np.arange(3)]
+        tri_mesh.set_verts(coordinates[corners])
         return tri_mesh
 
     @staticmethod
@@ -154,6 +161,9 @@ class Slicer:
         each ring and fill it in. Every single path that is generated during this process is flat-
         mapped into a ``final_slice`` object. Once each ring has been visited, the ``final_slice``
         object is pushed onto the list of ``filled_slices``, which is then returned.
+        \n
+        Every boundary is independent, so they are spread over ``am3.settings.SLICER_PROCESSES``
+        forked worker processes when that is more than one.
 
         :param boundaries: the boundaries to convert
         :type boundaries: List[List[LineSegment]]
@@ -161,18 +171,32 @@ class Slicer:
         :rtype: List[Slice]
         """
 
-        filled_slices = []
+        processes = min(am3.settings.SLICER_PROCESSES, len(boundaries))
+        if processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context('fork').Pool(processes) as pool:
+                return pool.map(_fill_boundary, boundaries)
 
-        for boundary in boundaries:
-            rings = Slicer.sort_boundary(boundary)
-            final_slice = Slice()
+        return [Slicer.fill_boundary(boundary) for boundary in boundaries]
 
-            for ring in rings:
-                final_slice.append(Slicer.fill_ring(ring))
-                
-            filled_slices.append(final_slice)
+    @staticmethod
+    def fill_boundary(boundary: List[LineSegment]) -> Slice:
+        """
+        Converts a single boundary to a filled Slice. See
+        :func:`~am3.slicer.Slicer.fill_boundaries`.
 
-        return filled_slices
+        :param boundary: the boundary to convert
+        :type boundary: List[LineSegment]
+        :return: the filled Slice
+        :rtype: Slice
+        """
+
+        rings = Slicer.sort_boundary(boundary)
+        final_slice = Slice()
+
+        for ring in rings:
+            final_slice.append(Slicer.fill_ring(ring))
+
+        return final_slice
 
     @staticmethod
     def sort_boundary(boundary: List[LineSegment]) -> Slice:
@@ -202,20 +226,16 @@ class Slicer:
         num_segments = len(line_segments)
 
         # This loop builds the ``endpoint_to_line_segment_dict`` so that it is indexed such that
-        # a Vector key will return a List of all LineSegments that have endpoints at that Vector.
+        # an endpoint key (see ``LineSegment.index_endpoints``) will return a List of all
+        # LineSegments that have endpoints at that point. The segments were already rounded
+        # by ``Slicer.slice_chunk``, so the tuple keys match exactly when the endpoints do.
         for segment in line_segments:
-            segment.simplify()
-
-            segment.getFirst().freeze() # this makes the Vector hashable
-            segment.getSecond().freeze() # this makes the Vector hashable
-
-            first = segment.getFirst()
-            second = segment.getSecond()
+            (first, second) = segment.index_endpoints()
 
             endpoint_to_line_segment_dict[first].append(segment)
             endpoint_to_line_segment_dict[second].append(segment)
 
-        # Creates the rings using the recursive function ``Slicer.build_chain``. Continues until
+        # Creates the rings using ``Slicer.build_ring``. Continues until
         # there are no more segments to place into a ring.
         counter = 0
         while endpoint_to_line_segment_dict.items():
@@ -245,9 +265,9 @@ class Slicer:
         return boundary_slice
 
     @staticmethod
-    def build_ring(segment: LineSegment, endpoints_to_line_segments_dict: Dict[Vector, LineSegment]) -> List[LineSegment]:
+    def build_ring(segment: LineSegment, endpoints_to_line_segments_dict: Dict[tuple, LineSegment]) -> List[LineSegment]:
         """
-        Recursively builds the ring that contains ``segment``. The logic is that, using
+        Builds the ring that contains ``segment``. The logic is that, using
         ``endpoints_to_line_segments_dict``, the current segment should be able to be constructed
         outward from both of its endpoints. That means that we take one of its vertices and check
         the Dict for any LineSegments that share that vertex. If one is found, it is considered
@@ -256,41 +276,59 @@ class Slicer:
         \n
         Note that this is destructive to ``endpoints_to_line_segments_dict``. As rings are built,
         the LineSegments are copied into the result and removed from the Dict.
+        \n
+        The walk is depth-first (everything found off a segment's first endpoint, then the
+        segment, then everything found off its second endpoint), using an explicit stack so large
+        rings can't exceed the recursion limit.
 
         :param segment: the segment to be used as a starting point for building this ring
         :type segment: LineSegment
         :param endpoints_to_line_segments_dict: the Dict used to index every LineSegment by its
-            endpoints
-        :type endpoints_to_line_segments_dict: Dict[Vector, LineSegment]
+            endpoint keys (see :func:`~am3.slicer.geometry.LineSegment.index_endpoints`)
+        :type endpoints_to_line_segments_dict: Dict[tuple, LineSegment]
         :return: the ring that contains ``segment``
         :rtype: List[LineSegment]
         """
 
-        left_list = endpoints_to_line_segments_dict[segment.getFirst()]
-        right_list = endpoints_to_line_segments_dict[segment.getSecond()]
+        array = []
+
+        # Each entry is (segment, left_list, right_list, stage). Stage 0 claims the segment and
+        # walks off its first endpoint, stage 1 places it and walks off its second endpoint, and
+        # stage 2 drops the endpoints that have no segments left.
+        stack = [(segment, None, None, 0)]
+        while stack:
+            (segment, left_list, right_list, stage) = stack.pop()
 
-        left_list.remove(segment)
-        right_list.remove(segment)
+            if stage == 0:
+                left_list = endpoints_to_line_segments_dict[segment._first_key]
+                right_list = endpoints_to_line_segments_dict[segment._second_key]
 
-        array = [segment]
+                left_list.remove(segment)
+                right_list.remove(segment)
 
-        if left_list:
-            left_segment = left_list[0]
-            if left_segment.getFirst() == segment.getFirst():
-                left_segment.flip()
-            array = Slicer.build_ring(left_segment, endpoints_to_line_segments_dict) + array
+                stack.append((segment, left_list, right_list, 1))
+                if left_list:
+                    left_segment = left_list[0]
+                    if left_segment._first_key == segment._first_key:
+                        left_segment.flip()
+                    stack.append((left_segment, None, None, 0))
 
-        if right_list:
-            right_segment = right_list[0]
-            if right_segment.getSecond() == segment.getSecond():
-                right_segment.flip()
-            array = array + Slicer.build_ring(right_list[0], endpoints_to_line_segments_dict)
+            elif stage == 1:
+                array.append(segment)
 
-        if not left_list and segment.getFirst() in endpoints_to_line_segments_dict:
-            del endpoints_to_line_segments_dict[segment.getFirst()]
+                stack.append((segment, left_list, right_list, 2))
+                if right_list:
+                    right_segment = right_list[0]
+                    if right_segment._second_key == segment._second_key:
+                        right_segment.flip()
+                    stack.append((right_segment, None, None, 0))
 
-        if not right_list and segment.getSecond() in endpoints_to_line_segments_dict:
-            del endpoints_to_line_segments_dict[segment.getSecond()]
+            else:
+                if not left_list and segment._first_key in endpoints_to_line_segments_dict:
+                    del endpoints_to_line_segments_dict[segment._first_key]
+
+                if not right_list and segment._second_key in endpoints_to_line_segments_dict:
+                    del endpoints_to_line_segments_dict[segment._second_key]
 
         return array
 
@@ -330,15 +368,22 @@ class Slicer:
         :rtype: List[Path]
         """
 
-        intersect_lines = SimulatorMath.get_intersection_lines_for_bounds(in_outline.vertices, inset)
+        # Converted once, since every infill line intersects the same outline. The intersections
+        # are kept as tuples, like the rest of the slicer's points
+        outline_points = in_outline.vertices_array()
+
+        intersect_lines = SimulatorMath.get_intersection_lines_for_bounds(outline_points, inset)
 
         last_size = 0
         intersection_groups = []
 
         paths = []
 
+        # Bound once rather than looked up on the class for every infill line
+        get_intersections = SimulatorMath.get_intersections_for_line_segments
+
         for x_value in intersect_lines:
-            intersections = SimulatorMath.get_intersections_for_line_segments(x_value, in_outline.vertices)
+            intersections = get_intersections(x_value, outline_points, as_vectors=False)
 
             new_size = len(intersections)
 
@@ -375,12 +420,21 @@ class Slicer:
         """
         path = Path()
 
-        for i in range(0, len(segments)):
-            if (i % 2 != 0):
-                segments[i].flip()
+        # All of the segments are flipped and shrunk at once as an (n, 2, 3) array, which gives the
+        # same points as calling LineSegment.flip and LineSegment.shrink on each one
+        points = np.array([segment.vertices for segment in segments],
+                          dtype=np.float64).reshape(-1, 2, 3)
+        points[1::2] = points[1::2, ::-1].copy()
 
-            segments[i].shrink(inset)
-            path.append(segments[i].getFirst())
-            path.append(segments[i].getSecond())
+        insets = np.where(points[:, 0, 1] > points[:, 1, 1], -inset, inset)
+        points[:, 0, 1] += insets
+        points[:, 1, 1] -= insets
+
+        path.vertices = [tuple(point) for point in points.reshape(-1, 3).tolist()]
 
         return path
+
+
+def _fill_boundary(boundary: List[LineSegment]) -> Slice:
+    # Module-level so worker processes can look it up by name
+    return Slicer.fill_boundary(boundary)
@@ -7,9 +7,201 @@ Contains classes for managing geometric data. Includes:
     * Triangle Meshes
 """
 
-from typing import List
+from typing import List, Tuple, Union
+import numpy as np
 from mathutils import Vector
 
+# As in am3.util, the slicing kernels below are compiled when numba has been installed into
+# Blender's Python. Otherwise slice_triangles is replaced by the numpy version below
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def intersect_triangle_plane(vertices, height, points) -> bool:
+    """
+    Intersects a triangle with the horizontal plane at ``Z = height``, following the same rules as
+    :func:`~am3.slicer.geometry.Triangle.intersectPlane`. When the plane cuts the triangle in a
+    line segment, its two endpoints are written to the rows of ``points``.
+
+    :param vertices: the triangle's three vertices, as ``(x, y, z)`` rows
+    :param height: the height of the plane
+    :param points: a ``(2, 3)`` array to store the intersection in
+    :return: ``True`` if the plane intersects the triangle in a line segment
+    :rtype: bool
+    """
+
+    count_back = 0
+    for j in range(3):
+        if vertices[j][2] - height < 0:
+            count_back += 1
+    if count_back == 0 or count_back == 3:
+        return False
+
+    count = 0
+    for i in range(3):  # edges 0-1, 1-2, 2-0 (CCW triangle)
+        a = vertices[i]
+        b = vertices[(i + 1) % 3]
+        da = a[2] - height
+        db = b[2] - height
+        if da * db < 0:
+            s = da / (da - db)  # intersection factor (between 0 and 1)
+            if count < 2:
+                points[count, 0] = a[0] + (b[0] - a[0]) * s
+                points[count, 1] = a[1] + (b[1] - a[1]) * s
+                points[count, 2] = a[2] + (b[2] - a[2]) * s
+            count += 1
+        elif da == 0:
+            if count < 2:
+                points[count, 0] = a[0]
+                points[count, 1] = a[1]
+                points[count, 2] = a[2]
+                count += 1
+        elif db == 0:
+            if count < 2:
+                points[count, 0] = b[0]
+                points[count, 1] = b[1]
+                points[count, 2] = b[2]
+                count += 1
+
+    return count == 2
+
+
+def slice_triangles(triangles, heights):
+    """
+    Intersects every triangle with the horizontal plane at each height in ``heights``. The
+    segments found for ``heights[k]`` are ``segments[offsets[k]:offsets[k + 1]]``, in the order
+    of their triangles.
+
+    Each plane is independent of the others, so when this is compiled by numba the planes are
+    sliced in parallel.
+
+    :param triangles: the triangles, each as three ``(x, y, z)`` rows
+    :param heights: the heights of the slicing planes
+    :return: a tuple of ``(segments, offsets)``, where ``segments`` is an ``(n, 2, 3)`` array of
+        segment endpoints
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+
+    n_heights = len(heights)
+    n_triangles = len(triangles)
+
+    # A triangle can only be cut by a plane that has a vertex below it and one on or above it.
+    # Counting those needs just the Z range of each triangle, so the space for each plane's
+    # segments is reserved without reading the whole vertex array
+    z_lows = np.empty(n_triangles, np.float64)
+    z_highs = np.empty(n_triangles, np.float64)
+    for t in range(n_triangles):
+        z_lows[t] = min(triangles[t][0][2], triangles[t][1][2], triangles[t][2][2])
+        z_highs[t] = max(triangles[t][0][2], triangles[t][1][2], triangles[t][2][2])
+
+    reserved = np.zeros(n_heights, np.int64)
+    for k in prange(n_heights):
+        count = 0
+        for t in range(n_triangles):
+            if z_lows[t] < heights[k] <= z_highs[t]:
+                count += 1
+        reserved[k] = count
+
+    starts = np.zeros(n_heights + 1, np.int64)
+    for k in range(n_heights):
+        starts[k + 1] = starts[k] + reserved[k]
+
+    # One pass over the vertices, intersecting and writing each segment straight into its
+    # plane's reserved space. Triangles that only touch the plane at a vertex or along an edge
+    # use their space without making a segment, so the count actually found is kept as well
+    segments = np.empty((starts[n_heights], 2, 3), np.float64)
+    counts = np.zeros(n_heights, np.int64)
+    for k in prange(n_heights):
+        height = heights[k]
+        index = starts[k]
+        for t in range(n_triangles):
+            if z_lows[t] < height <= z_highs[t]:
+                if intersect_triangle_plane(triangles[t], height, segments[index]):
+                    index += 1
+        counts[k] = index - starts[k]
+
+    offsets = np.zeros(n_heights + 1, np.int64)
+    for k in range(n_heights):
+        offsets[k + 1] = offsets[k] + counts[k]
+    if offsets[n_heights] == starts[n_heights]:
+        return (segments, offsets)
+
+    # Close the gaps left by the touching triangles
+    packed = np.empty((offsets[n_heights], 2, 3), np.float64)
+    for k in range(n_heights):
+        packed[offsets[k]:offsets[k + 1]] = segments[starts[k]:starts[k] + counts[k]]
+    return (packed, offsets)
+
+
+def slice_triangles_numpy(triangles: np.ndarray, heights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the same result as :func:`~am3.slicer.geometry.slice_triangles` with numpy array
+    operations, for when numba is not available. Each plane is still visited in turn, but every
+    triangle is intersected with it at once: the three edges are walked in order for all of the
+    triangles together, following the rules of
+    :func:`~am3.slicer.geometry.intersect_triangle_plane`.
+
+    :param triangles: the triangles, as an ``(n, 3, 3)`` array
+    :type triangles: numpy.ndarray
+    :param heights: the heights of the slicing planes
+    :type heights: numpy.ndarray
+    :return: a tuple of ``(segments, offsets)``, where ``segments`` is an ``(n, 2, 3)`` array of
+        segment endpoints
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+    """
+
+    # The triangles keep their own float type, as they do in the compiled kernel
+    triangles = np.asarray(triangles).reshape(-1, 3, 3)
+    rows = np.arange(len(triangles))
+
+    blocks = []
+    offsets = np.zeros(len(heights) + 1, np.int64)
+    for (k, height) in enumerate(heights):
+        distances = triangles[:, :, 2] - height
+        count_back = (distances < 0).sum(axis=1)
+        crossed = (count_back != 0) & (count_back != 3)
+
+        points = np.empty((len(triangles), 2, 3), np.float64)
+        count = np.zeros(len(triangles), np.int64)
+        for i in range(3):  # edges 0-1, 1-2, 2-0 (CCW triangle)
+            (a, b) = (triangles[:, i], triangles[:, (i + 1) % 3])
+            (da, db) = (distances[:, i], distances[:, (i + 1) % 3])
+
+            crossing = da * db < 0
+            at_a = ~crossing & (da == 0)
+            at_b = ~crossing & (da != 0) & (db == 0)
+
+            # Where the edge crosses the plane, the point is between a and b, as in the kernel.
+            # The other edges divide by zero here, but their results are never used
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = da / (da - db)
+                between = a + (b - a) * s[:, np.newaxis]
+            point = np.where(crossing[:, np.newaxis], between, np.where(at_a[:, np.newaxis], a, b))
+
+            room = count < 2
+            written = crossed & room & (crossing | at_a | at_b)
+            points[rows[written], count[written]] = point[written]
+            count += crossing | ((at_a | at_b) & room)
+
+        found = crossed & (count == 2)
+        blocks.append(points[found])
+        offsets[k + 1] = offsets[k] + len(blocks[-1])
+
+    if blocks:
+        return (np.concatenate(blocks), offsets)
+    return (np.empty((0, 2, 3), np.float64), offsets)
+
+
+if njit is not None:
+    intersect_triangle_plane = njit(cache=True)(intersect_triangle_plane)
+    slice_triangles = njit(cache=True, parallel=True)(slice_triangles)
+else:
+    slice_triangles = slice_triangles_numpy
+
+
 def roundSig(x: float, sig: int=3) -> float:
     """
     Rounds a number to ``sig`` decimal places.
@@ -22,33 +214,41 @@ def roundSig(x: float, sig: int=3) -> float:
     :rtype: float
     """
 
-    format_string = "{0:." + str(sig) + "f}"
-    return float(format_string.format(x))
+    # round() gives the same correctly rounded result as formatting with ``sig`` decimal places
+    # and parsing the string back, without building the string
+    return round(float(x), sig)
 
 class LineSegment:
     """
-    Defines a line segment using two 3D points, ``p0`` and ``p1``.
+    Defines a line segment using two 3D points, ``p0`` and ``p1``. The points can be Vectors or
+    plain ``(x, y, z)`` tuples; the slicer uses tuples, since it makes millions of segments and
+    never needs Vector math on them.
     """
 
     vertices = []
     """
     The list of vertices for this line segment. In this case, the list length will be 2
 
-    :type: List[Vector]
+    :type: List[Vector] or List[Tuple[float, float, float]]
     """
 
+    # Hashable copies of the endpoints, set by index_endpoints and kept in step by flip
+    _first_key = None
+    _second_key = None
+
     # p0: Vector, p1: Vector
-    def __init__(self, p0 = Vector((0,0,0)), p1 = Vector((0,0,0))):
+    def __init__(self, p0 = None, p1 = None):
         """
-        :param p0: the start point of the line segment
-        :type p0: Vector
-        :param p1: the end point of the line segment
-        :type p1: Vector
+        :param p0: the start point of the line segment (default ``(0, 0, 0)``)
+        :type p0: Vector or Tuple[float, float, float]
+        :param p1: the end point of the line segment (default ``(0, 0, 0)``)
+        :type p1: Vector or Tuple[float, float, float]
         """
 
-        self.vertices = []
-        self.vertices.append(p0)
-        self.vertices.append(p1)
+        # The defaults are created per segment, since shared default points would be modified
+        # by every segment using them
+        self.vertices = [p0 if p0 is not None else (0.0, 0.0, 0.0),
+                         p1 if p1 is not None else (0.0, 0.0, 0.0)]
 
     def flip(self):
         """
@@ -67,6 +267,8 @@ class LineSegment:
         self.vertices[0] = self.vertices[1]
         self.vertices[1] = temp
 
+        (self._first_key, self._second_key) = (self._second_key, self._first_key)
+
     def shrink(self, inset: float):
         """
         Decreases the Y-length of the link segment by ``inset``. For example::
@@ -80,15 +282,17 @@ class LineSegment:
             ls2.shrink(5)
             print(ls2.vertices) # [(10, 15, 10), (10, 10, 10)]
         
+        The shrunk vertices are replaced with ``(x, y, z)`` tuples.
+
         :param inset: the amount to shrink the Y length of this LineSegment by
         :type inset: float
         """
-        if (self.vertices[0][1] > self.vertices[1][1]):
-            self.vertices[0][1] -= inset
-            self.vertices[1][1] += inset
-        else:
-            self.vertices[0][1] += inset
-            self.vertices[1][1] -= inset
+        (first, second) = self.vertices
+        # +1 when the first end is the lower one, -1 otherwise, so both ends move inward
+        inset *= (first[1] <= second[1]) - (first[1] > second[1])
+
+        self.vertices[0] = (first[0], first[1] + inset, first[2])
+        self.vertices[1] = (second[0], second[1] - inset, second[2])
 
     def simplify(self, sigfigs: int = 3):
         """
@@ -98,26 +302,45 @@ class LineSegment:
             ls1.simplify(3)
             print(ls1.vertices) # [(0.123, 0.12, 1.2), (10, 10.543, 123456)]
 
+        The rounded vertices are replaced with ``(x, y, z)`` tuples.
+
+        :param sigfigs: the number of decimal places to round to
+        :type sigfigs: int
+        """
+        self.vertices = [(roundSig(vertex[0], sigfigs),
+                          roundSig(vertex[1], sigfigs),
+                          roundSig(vertex[2], sigfigs)) for vertex in self.vertices]
+
+    def index_endpoints(self, sigfigs: int = 3) -> Tuple[tuple, tuple]:
+        """
+        Computes hashable keys for both endpoints of this LineSegment: each is an ``(x, y, z)``
+        tuple rounded to ``sigfigs`` decimal places. Two endpoints have the same key exactly when
+        they would be equal after :func:`~am3.slicer.geometry.LineSegment.simplify`. The keys are
+        stored as ``_first_key`` and ``_second_key``, and stay in order through ``flip``.
+
         :param sigfigs: the number of decimal places to round to
         :type sigfigs: int
+        :return: the keys of the first and second endpoints
+        :rtype: Tuple[tuple, tuple]
         """
-        for vertex in self.vertices:
-            vertex[0] = roundSig(vertex[0], sigfigs)
-            vertex[1] = roundSig(vertex[1], sigfigs)
-            vertex[2] = roundSig(vertex[2], sigfigs)
 
-    def getFirst(self) -> Vector:
+        (first, second) = self.vertices
+        self._first_key = (round(first[0], sigfigs), round(first[1], sigfigs), round(first[2], sigfigs))
+        self._second_key = (round(second[0], sigfigs), round(second[1], sigfigs), round(second[2], sigfigs))
+        return (self._first_key, self._second_key)
+
+    def getFirst(self) -> Union[Vector, Tuple[float, float, float]]:
         """
         :return: the first vertex of this line segment
-        :rtype: Vector
+        :rtype: Vector or Tuple[float, float, float]
         """
 
         return self.vertices[0]
 
-    def getSecond(self):
+    def getSecond(self) -> Union[Vector, Tuple[float, float, float]]:
         """
         :return: the second vertex of this line segment
-        :rtype: Vector
+        :rtype: Vector or Tuple[float, float, float]
         """
 
         return self.vertices[1]
@@ -236,7 +459,8 @@ class Triangle:
 
         :param plane: the plane to intersect with
         :type plane: Plane
-        :param line_segment: the LineSegment in which to store the intersection, if any
+        :param line_segment: the LineSegment in which to store the intersection, if any. Its
+            vertices are set to ``(x, y, z)`` tuples.
         :type line_segment: LineSegment
         :return: an int, indicating what type of intersection occurred.
         :rtype: int
@@ -245,8 +469,10 @@ class Triangle:
         countFront = 0
         countBack = 0
 
-        for j in range(0, 3):
-            distance = plane.distanceToPoint(self.vertices[j])
+        # Each vertex's distance is needed by both loops below, so it is only measured once
+        distances = [plane.distanceToPoint(vertex) for vertex in self.vertices]
+
+        for distance in distances:
             if distance < 0:
                 countBack += 1
             else:
@@ -263,18 +489,21 @@ class Triangle:
         for i in range(0, 3):
             a = self.vertices[lines[i * 2 + 0]]
             b = self.vertices[lines[i * 2 + 1]]
-            da = plane.distanceToPoint(a)
-            db = plane.distanceToPoint(b)
+            da = distances[lines[i * 2 + 0]]
+            db = distances[lines[i * 2 + 1]]
             if da * db < 0:
                 s = da / (da - db) # intersection factor (between 0 and 1)
-                b_minus_a = b - a
-                intersectPoints.append(a+b_minus_a*s)
+                # Interpolated per coordinate into a tuple, rather than through Vector arithmetic
+                # that builds a new Vector for every operation
+                intersectPoints.append((a[0] + (b[0] - a[0]) * s,
+                                        a[1] + (b[1] - a[1]) * s,
+                                        a[2] + (b[2] - a[2]) * s))
             elif da == 0:
                 if len(intersectPoints) < 2:
-                    intersectPoints.append(a)
+                    intersectPoints.append(tuple(a[:3]))
             elif db == 0:
                 if len(intersectPoints) < 2:
-                    intersectPoints.append(b)
+                    intersectPoints.append(tuple(b[:3]))
 
         if len(intersectPoints) == 2:
             line_segment.vertices[0] = intersectPoints[0]
@@ -286,81 +515,139 @@ class Triangle:
 
 class TriangleMesh:
     """
-    Represents a triangular mesh using a list of Triangles (see :class:`~am3.slicer.geometry.Triangle`).
-    """
+    Represents a triangular mesh (see :class:`~am3.slicer.geometry.Triangle`). The triangles are
+    stored together in a single array rather than as Triangle objects, so bounds and slicing work
+    on the whole mesh at once.
 
-    mesh = []
+    The array is float32, which is how Blender stores mesh coordinates in the first place, so
+    copying a mesh in loses nothing, and slicing reads half as many bytes as it would for float64.
     """
-    Represents a triangular mesh using a list of Triangles
 
-    :type: List[Triangle]
-    """
+    def __init__(self):
+        """
+        Initializes an emtpy triangular mesh, with an inverted, large bounding box.
+        """
 
-    bottomLeftVertex = Vector((999999, 999999, 999999))
-    """
-    Represents the bottom left corner of the mesh boundary (where \"bottom\" and \"left\" only mean
-    anything when related to the position of the ``upperRightVertex``).
+        self._verts = np.empty((0, 3, 3), dtype=np.float32)
+        self._pending = []
+        # The (bottom left, upper right) corners of ``_verts``, computed when first needed,
+        # widened as appended triangles are added and dropped when the triangles are replaced
+        self._bounds = None
 
-    :type: Vector
-    """
+    @property
+    def verts(self) -> np.ndarray:
+        """
+        The vertices of every triangle in this mesh, as an ``(n, 3, 3)`` float32 array indexed by
+        triangle, vertex and coordinate. Triangles added with
+        :func:`~am3.slicer.geometry.TriangleMesh.append` are moved into the array the next time it
+        is read.
 
-    upperRightVertex = Vector((-999999, -999999, -999999))
-    """
-    Represents the upper right corner of the mesh boundary (where \"upper\" and \"right\" only mean
-    anything when related to the position of the ``bottomLeftVertex``)
+        :type: numpy.ndarray
+        """
 
-    :type: Vector
-    """
+        if self._pending:
+            pending = np.array(self._pending, dtype=np.float32).reshape(-1, 3, 3)
+            self._verts = np.concatenate((self._verts, pending))
+            self._pending = []
 
-    def __init__(self):
+            # Only the new triangles need reducing to keep already known bounds up to date
+            if self._bounds is not None:
+                (bottom_left, upper_right) = self._bounds
+                self._bounds = (np.minimum(bottom_left, pending.min(axis=(0, 1)).astype(np.float64)),
+                                np.maximum(upper_right, pending.max(axis=(0, 1)).astype(np.float64)))
+        return self._verts
+
+    def set_verts(self, verts: np.ndarray):
         """
-        Initializes an emtpy triangular mesh, with an inverted, large bounding box.
+        Replaces every triangle in this mesh. The mesh keeps its own float32 copy of ``verts``.
+
+        :param verts: the vertices of the triangles, as an ``(n, 3, 3)`` array
+        :type verts: numpy.ndarray
+        """
+
+        self._verts = np.array(verts, dtype=np.float32).reshape(-1, 3, 3)
+        self._pending = []
+        self._bounds = None
+
+    def bounds(self) -> Tuple[np.ndarray, np.ndarray]:
         """
+        Returns the corners of the box bounding this mesh. They are computed once and reused until
+        the triangles change. An empty mesh has an inverted, large bounding box.
 
-        self.bottomLeftVertex = Vector((999999, 999999, 999999))
-        self.upperRightVertex = Vector((-999999, -999999, -999999))
-        self.mesh = []
+        :return: the bottom left and upper right corners, as length 3 float64 arrays
+        :rtype: Tuple[numpy.ndarray, numpy.ndarray]
+        """
+
+        verts = self.verts
+        if self._bounds is None:
+            if len(verts):
+                self._bounds = (verts.min(axis=(0, 1)).astype(np.float64),
+                                verts.max(axis=(0, 1)).astype(np.float64))
+            else:
+                self._bounds = (np.full(3, 999999.0), np.full(3, -999999.0))
+        return self._bounds
+
+    @property
+    def mesh(self) -> List[Triangle]:
+        """
+        The triangles of this mesh, built as new Triangle objects on every access.
+
+        :type: List[Triangle]
+        """
+
+        return [Triangle(Vector(v0), Vector(v1), Vector(v2)) for (v0, v1, v2) in self.verts.tolist()]
+
+    @property
+    def bottomLeftVertex(self) -> Vector:
+        """
+        Represents the bottom left corner of the mesh boundary (where \"bottom\" and \"left\" only mean
+        anything when related to the position of the ``upperRightVertex``).
+
+        :type: Vector
+        """
+
+        return Vector(self.bounds()[0].tolist())
+
+    @property
+    def upperRightVertex(self) -> Vector:
+        """
+        Represents the upper right corner of the mesh boundary (where \"upper\" and \"right\" only mean
+        anything when related to the position of the ``bottomLeftVertex``)
+
+        :type: Vector
+        """
+
+        return Vector(self.bounds()[1].tolist())
 
     def normalize(self):
         """
         Normalizes a triangular mesh, meaning the mesh is centered around (0, 0, 0)
         """
 
-        box_midpoint = (self.upperRightVertex - self.bottomLeftVertex) / 2
-        start = self.bottomLeftVertex + box_midpoint
+        bottom_left = self.bottomLeftVertex
+        box_midpoint = (self.upperRightVertex - bottom_left) / 2
+        start = np.array(bottom_left + box_midpoint, dtype=np.float64)
 
-        for i in range(0, len(self.mesh)):
-            self.mesh[i].subtract(start)
-
-        self.bottomLeftVertex = box_midpoint * -1
-        self.upperRightVertex = box_midpoint
+        # The vertex array is always owned by the mesh, so it is shifted in place. Subtraction and
+        # the rounding back to float32 both preserve order, so the shifted corners, rounded the
+        # same way, are exactly the new bounds
+        (bottom_left, upper_right) = self.bounds()
+        verts = self.verts
+        verts -= start
+        if len(verts):
+            self._bounds = ((bottom_left - start).astype(np.float32).astype(np.float64),
+                            (upper_right - start).astype(np.float32).astype(np.float64))
 
     def append(self, triangle: Triangle):
         """
-        Adds a Triangle to this mesh. After a new triangle is added, it must be tested whether or
-        not this triangle requires a boundary expansion.
+        Adds a Triangle to this mesh. The mesh boundary is derived from the triangles, so it
+        expands to include the new triangle automatically.
 
         :param triangle: the Triangle to add to this mesh
         :type triangle: Triangle
         """
 
-        self.mesh.append(triangle)
-        for i in range(0, 3):
-            first = triangle.vertices[i].x
-            second = self.bottomLeftVertex[0]
-
-            if first < second:
-                self.bottomLeftVertex[0] = triangle.vertices[i][0]
-            if triangle.vertices[i][1] < self.bottomLeftVertex[1]:
-                self.bottomLeftVertex[1] = triangle.vertices[i][1]
-            if triangle.vertices[i][2] < self.bottomLeftVertex[2]:
-                self.bottomLeftVertex[2] = triangle.vertices[i][2]
-            if triangle.vertices[i][0] > self.upperRightVertex[0]:
-                self.upperRightVertex[0] = triangle.vertices[i][0]
-            if triangle.vertices[i][1] > self.upperRightVertex[1]:
-                self.upperRightVertex[1] = triangle.vertices[i][1]
-            if triangle.vertices[i][2] > self.upperRightVertex[2]:
-                self.upperRightVertex[2] = triangle.vertices[i][2]
+        self._pending.append([vertex[:3] for vertex in triangle.vertices])
 
     def meshAABBSize(self) -> Vector:
         """
@@ -371,7 +658,4 @@ class TriangleMesh:
         :rtype: Vector
         """
 
-        x = self.upperRightVertex[0] - self.bottomLeftVertex[0]
-        y = self.upperRightVertex[1] - self.bottomLeftVertex[1]
-        z = self.upperRightVertex[2] - self.bottomLeftVertex[2]
-        return Vector((x,y,z))
+        return self.upperRightVertex - self.bottomLeftVertex
@@ -4,11 +4,154 @@ miscellaneous calculations needed throughout the chunking, slicing, and simulati
 """
 
 import math
-from typing import List, Tuple, Dict
+import multiprocessing
+from collections import namedtuple
+from typing import List, Tuple, Dict, Union
 import bpy
+import numpy as np
 from mathutils import Vector
+import am3.settings
 from am3.slicer.geometry import LineSegment
 
+AxisBounds = namedtuple('AxisBounds', 'min max distance')
+"""The ``min``, ``max`` and ``distance`` (``max - min``) of a model along one axis"""
+
+ObjectBounds = namedtuple('ObjectBounds', 'x y z')
+"""The :data:`AxisBounds` of a model along each of the X, Y and Z axes"""
+
+# Blender does not bundle numba. When it has been installed into Blender's Python, the kernels
+# below are compiled; otherwise they run as plain Python over floats
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def walk_move_path(xs, ys, zs, speeds, start_x, start_y, start_z, time_step):
+    """
+    Walks a robot along a sequence of moves, cutting the path into frames of ``time_step``
+    seconds. Move ``j`` goes to ``(xs[j], ys[j], zs[j])`` at ``speeds[j]`` mm/s, starting from
+    the start point or the previous move's target. Whenever a frame fills up part way through a
+    move, the robot's position at that instant is recorded, and the rest of the move carries on
+    in the next frame.
+
+    This works on plain sequences of floats, so it can be compiled by numba when available.
+
+    :return: a tuple of ``(moves, xs, ys, zs)`` arrays, with one entry per completed frame:
+        the index of the move during which the frame ended, and the robot's position at that time
+    :rtype: Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray, numpy.ndarray]
+    """
+
+    # The first pass only counts the frames so the outputs can be allocated exactly
+    frame_moves = np.empty(0, np.int64)
+    frame_xs = np.empty(0, np.float64)
+    frame_ys = np.empty(0, np.float64)
+    frame_zs = np.empty(0, np.float64)
+
+    for record in range(2):
+        count = 0
+        accumulated_time = 0.0
+        x = start_x
+        y = start_y
+        z = start_z
+
+        for j in range(len(xs)):
+            # The move's target and speed are read once, not on every frame the move spans
+            target_x = xs[j]
+            target_y = ys[j]
+            target_z = zs[j]
+            speed = speeds[j]
+
+            while True:
+                d_x = target_x - x
+                d_y = target_y - y
+                d_z = target_z - z
+                time_to_complete = math.sqrt(d_x * d_x + d_y * d_y + d_z * d_z) / speed
+
+                if accumulated_time + time_to_complete < time_step:
+                    accumulated_time += time_to_complete
+                    x = target_x
+                    y = target_y
+                    z = target_z
+                    break
+
+                percentage = (time_step - accumulated_time) / time_to_complete
+                x = x + d_x * percentage
+                y = y + d_y * percentage
+                z = z + d_z * percentage
+                accumulated_time = 0.0
+
+                if record == 1:
+                    frame_moves[count] = j
+                    frame_xs[count] = x
+                    frame_ys[count] = y
+                    frame_zs[count] = z
+                count += 1
+
+        if record == 0:
+            frame_moves = np.empty(count, np.int64)
+            frame_xs = np.empty(count, np.float64)
+            frame_ys = np.empty(count, np.float64)
+            frame_zs = np.empty(count, np.float64)
+
+    return (frame_moves, frame_xs, frame_ys, frame_zs)
+
+
+def segments_cross(ax, ay, bx, by, cx, cy, dx, dy) -> bool:
+    """
+    Determines if the segments ``a``-``b`` and ``c``-``d`` intersect in the XY plane, exactly as
+    :func:`~am3.util.SimulatorMath.segments_intersect` does, with the four
+    :func:`~am3.util.SimulatorMath.ccw` tests written out over plain floats.
+
+    :return: Whether or not the line segments intersect
+    :rtype: bool
+    """
+
+    acd = (dy - ay) * (cx - ax) > (cy - ay) * (dx - ax)
+    bcd = (dy - by) * (cx - bx) > (cy - by) * (dx - bx)
+    abc = (cy - ay) * (bx - ax) > (by - ay) * (cx - ax)
+    abd = (dy - ay) * (bx - ax) > (by - ay) * (dx - ax)
+    return acd != bcd and abc != abd
+
+
+def count_rectangle_crossings(ax, ay, bx, by, min_x, min_y, max_x, max_y) -> int:
+    """
+    Counts the sides of the rectangle from ``(min_x, min_y)`` to ``(max_x, max_y)`` that the
+    segment ``a``-``b`` crosses, as tested by :func:`~am3.util.segments_cross`.
+
+    :return: the number of sides crossed, from ``0`` to ``4``
+    :rtype: int
+    """
+
+    count = 0
+    if segments_cross(ax, ay, bx, by, min_x, max_y, max_x, max_y):
+        count += 1
+    if segments_cross(ax, ay, bx, by, max_x, max_y, max_x, min_y):
+        count += 1
+    if segments_cross(ax, ay, bx, by, max_x, min_y, min_x, min_y):
+        count += 1
+    if segments_cross(ax, ay, bx, by, min_x, min_y, min_x, max_y):
+        count += 1
+    return count
+
+
+if njit is not None:
+    walk_move_path = njit(cache=True)(walk_move_path)
+    segments_cross = njit(cache=True)(segments_cross)
+    count_rectangle_crossings = njit(cache=True)(count_rectangle_crossings)
+
+
+def _walk_move_paths(paths, start, time_step):
+    """
+    Runs :func:`~am3.util.walk_move_path` on each ``(xs, ys, zs, speeds)`` path in ``paths``, all
+    starting from ``start``. This is one robot's share of
+    :func:`~am3.util.SimulatorMath.split_robot_moves_into_frames`, kept at module level so that
+    worker processes can run it.
+    """
+
+    return [walk_move_path(xs, ys, zs, speeds, start[0], start[1], start[2], time_step)
+            for (xs, ys, zs, speeds) in paths]
+
 
 class SimulatorMath:
     """
@@ -17,7 +160,7 @@ class SimulatorMath:
     """
 
     @staticmethod
-    def calculate_bounds(model: bpy.types.Object) -> object:
+    def calculate_bounds(model: bpy.types.Object) -> ObjectBounds:
         """
         Returns a ``bounds`` object, which contains the X, Y, and Z direction boundaries for
         the ``model`` parameter. It will have the following format::
@@ -39,31 +182,18 @@ class SimulatorMath:
         :param model: a model for which to calculate the bounds.
         :type model: bpy.types.Object
         :return: An object containing boundary information for ``model``
-        :rtype: object
+        :rtype: ObjectBounds
         """
 
-        local_coords = model.bound_box[:]
-        om = model.matrix_world
-
-        worldify = lambda p: om * Vector(p[:])
-        coords = [worldify(p).to_tuple() for p in local_coords]
-
-        rotated = zip(*coords[::-1])
+        # Transform all eight corners of the local bounding box to world space in one product
+        local_coords = np.array([corner[:] for corner in model.bound_box])
+        om = np.array(model.matrix_world)
+        coords = local_coords.dot(om[:3, :3].T) + om[:3, 3]
 
-        push_axis = []
-        for (_, _list) in zip('xyz', rotated):
-            info = lambda: None
-            info.max = max(_list)
-            info.min = min(_list)
-            info.distance = info.max - info.min
-            push_axis.append(info)
+        lows = coords.min(axis=0).tolist()
+        highs = coords.max(axis=0).tolist()
 
-        import collections
-
-        originals = dict(zip(['x', 'y', 'z'], push_axis))
-
-        o_details = collections.namedtuple('object_details', 'x y z')
-        return o_details(**originals)
+        return ObjectBounds(*(AxisBounds(low, high, high - low) for (low, high) in zip(lows, highs)))
 
     @staticmethod
     def distance_to_line(point: Vector, line: List[Vector]) -> float:
@@ -174,11 +304,8 @@ class SimulatorMath:
         :rtype: int
         """
 
-        if number > 0:
-            return 1
-        if number < 0:
-            return -1
-        return 0
+        # Booleans subtract as ints, so this needs no branches
+        return int(number > 0) - int(number < 0)
 
     @staticmethod
     def line_intersects_bounds(line: Vector, bounds: object) -> bool:
@@ -195,17 +322,11 @@ class SimulatorMath:
         :rtype: bool
         """
 
-        # Number of intersections. Must be exactly 2 to be a valid intersection
-        intersection_count = 0
-        bound_a_b = [(bounds.x.min, bounds.y.max), (bounds.x.max, bounds.y.max)]
-        bound_b_c = [(bounds.x.max, bounds.y.max), (bounds.x.max, bounds.y.min)]
-        bound_c_d = [(bounds.x.max, bounds.y.min), (bounds.x.min, bounds.y.min)]
-        bound_d_a = [(bounds.x.min, bounds.y.min), (bounds.x.min, bounds.y.max)]
-        bound_lines = [bound_a_b, bound_b_c, bound_c_d, bound_d_a]
-
-        for bound_line in bound_lines:
-            if SimulatorMath.segments_intersect(line, bound_line):
-                intersection_count += 1
+        # Number of intersections with the four sides of the bounds. Must be exactly 2 to be a
+        # valid intersection
+        intersection_count = count_rectangle_crossings(
+            float(line[0][0]), float(line[0][1]), float(line[1][0]), float(line[1][1]),
+            float(bounds.x.min), float(bounds.y.min), float(bounds.x.max), float(bounds.y.max))
 
         return intersection_count == 2
 
@@ -244,41 +365,66 @@ class SimulatorMath:
         b = seg1[1]
         c = seg2[0]
         d = seg2[1]
-        return SimulatorMath.ccw(a, c, d) != SimulatorMath.ccw(b, c, d) and \
-            SimulatorMath.ccw(a, b, c) != SimulatorMath.ccw(a, b, d)
+        return bool(segments_cross(float(a[0]), float(a[1]), float(b[0]), float(b[1]),
+                                   float(c[0]), float(c[1]), float(d[0]), float(d[1])))
 
     @staticmethod
-    def linear_interpolation(p0: Vector, p1: Vector, percentage: float) -> Vector:
+    def split_robot_moves_into_frames(robot_chunks: List[List[object]],
+                                      starts: List[Vector],
+                                      time_step: float) -> List[List[Tuple[List[int], List[Vector]]]]:
         """
-        Interpolates a point from ``p0`` to ``p1`` by the value of ``percentage``. ``percentage``
-        should vary from ``0`` to ``1``.
-
-        For example::
-
-            p0 = Vector((0, 0, 0))
-            p1 = Vector((0, 5, 0))
-            interpolated = lineaer_interpolation(p0, p1, 0.5)
-            print(interpolated) # prints \"(0, 2.5, 0)\"
-
-        :param p0: the start point
-        :type p0: Vector
-        :param p1: the end point
-        :type p1: Vector
-        :param percentage: the percentage along which to interpolate
-        :type percentage: float
-        :return: the interpolated point
-        :rtype: Vector
+        Cuts the moves of every chunk of every robot into frames of ``time_step`` seconds. See
+        :func:`~am3.util.walk_move_path` for how a path is cut. ``robot_chunks[i]`` holds the
+        chunks of robot ``i``, and the moves of each of those chunks start from ``starts[i]``.
+        \n
+        Every robot walks its own chunks, so the robots are spread over
+        ``am3.settings.SIMULATOR_PROCESSES`` forked worker processes when that is more than one.
+        Only the move coordinates are sent to the workers and only the frame ends come back; the
+        Vectors are built here.
+
+        :param robot_chunks: the chunks of every robot, with their commands generated
+        :type robot_chunks: List[List[Chunk]]
+        :param starts: where each robot is before the first move of each of its chunks
+        :type starts: List[Vector]
+        :param time_step: the length of a frame, in seconds
+        :type time_step: float
+        :return: for every chunk of every robot, the index of the move during which each frame
+            ended, and the robot's location at that time
+        :rtype: List[List[Tuple[List[int], List[Vector]]]]
         """
 
-        x_dist = p1[0] - p0[0]
-        y_dist = p1[1] - p0[1]
-        z_dist = p1[2] - p0[2]
-
-        x_pos = p0[0] + x_dist * percentage
-        y_pos = p0[1] + y_dist * percentage
-        z_pos = p0[2] + z_dist * percentage
-
-        return Vector((x_pos, y_pos, z_pos))
+        tasks = []
+        for (chunks, start) in zip(robot_chunks, starts):
+            paths = []
+            for chunk in chunks:
+                locations = chunk.move_locations
+                if njit is not None:
+                    path = (np.ascontiguousarray(locations[:, 0], dtype=np.float64),
+                            np.ascontiguousarray(locations[:, 1], dtype=np.float64),
+                            np.ascontiguousarray(locations[:, 2], dtype=np.float64),
+                            np.ascontiguousarray(chunk.move_speeds, dtype=np.float64))
+                else:
+                    # Indexing plain lists is much faster than indexing arrays from Python
+                    path = (locations[:, 0].tolist(),
+                            locations[:, 1].tolist(),
+                            locations[:, 2].tolist(),
+                            chunk.move_speeds.tolist())
+                paths.append(path)
+            tasks.append((paths, (float(start[0]), float(start[1]), float(start[2])), float(time_step)))
+
+        processes = min(am3.settings.SIMULATOR_PROCESSES, len(tasks))
+        if processes > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context('fork').Pool(processes) as pool:
+                robot_walks = pool.starmap(_walk_move_paths, tasks)
+        else:
+            robot_walks = [_walk_move_paths(*task) for task in tasks]
+
+        return [[(frame_moves.tolist(),
+                  [Vector(point) for point in zip(frame_xs.tolist(),
+                                                  frame_ys.tolist(),
+                                                  frame_zs.tolist())])
+                 for (frame_moves, frame_xs, frame_ys, frame_zs) in walks]
+                for walks in robot_walks]
 
     @staticmethod
     def get_intersection_at_x_position(line_segment: LineSegment, x_position: float) -> Vector:
@@ -293,50 +439,35 @@ class SimulatorMath:
         :rtype: Vector
         """
 
-        min_x = min(line_segment.getFirst()[0], line_segment.getSecond()[0])
-        max_x = max(line_segment.getFirst()[0], line_segment.getSecond()[0])
+        (first, second) = (line_segment.getFirst(), line_segment.getSecond())
+        x_length = second[0] - first[0]
 
-        if min_x == max_x:
+        if x_length == 0:
             return None
 
-        x_length = line_segment.getSecond()[0] - line_segment.getFirst()[0]
+        # How far along the segment the plane is; the Y offset then carries the sign of the
+        # segment's own Y direction, so no separate up/down case is needed
+        t = (x_position - first[0]) / x_length
 
-        if x_position < min_x or x_position > max_x:
+        if t < 0 or t > 1:
             return None
 
-        distance_to_first_point_x = x_position -  line_segment.getFirst()[0]
-        y_length = line_segment.getSecond()[1] - line_segment.getFirst()[1]
-
-        y_shift = abs(y_length * (distance_to_first_point_x / x_length))
-
-        z_position = line_segment.getFirst()[2]
-
-        if y_length > 0:
-            return Vector((x_position, line_segment.getFirst()[1] + y_shift, z_position))
-
-        return Vector((x_position, line_segment.getFirst()[1] - y_shift, z_position))
+        return Vector((x_position, first[1] + (second[1] - first[1]) * t, first[2]))
 
     @staticmethod
     def get_extreme_x_values(bounds: List[Vector]) -> Tuple[float, float]:
         """
         Returns the lowest and highest X values encountered in ``bounds`` as a Tuple.
 
-        :param bounds: a list of points to find the min and max X values.
-        :type bounds: List[Vector]
+        :param bounds: a list of points (or an ``(n, 3)`` array) to find the min and max X values.
+        :type bounds: List[Vector] or numpy.ndarray
         :return: the two X values at the min and max of ``bounds``
         :rtype: Tuple[float, float]
         """
 
-        left_extreme = bounds[0]
-        right_extreme = bounds[0]
+        x_values = np.fromiter((point[0] for point in bounds), dtype=np.float64, count=len(bounds))
 
-        for point in bounds:
-            if point[0] < left_extreme[0]:
-                left_extreme = point
-            if point[0] > right_extreme[0]:
-                right_extreme = point
-
-        return left_extreme[0], right_extreme[0]
+        return float(x_values.min()), float(x_values.max())
 
     @staticmethod
     def get_intersection_lines_for_bounds(bounds: List[Vector], thickness: float) -> List[float]:
@@ -346,7 +477,7 @@ class SimulatorMath:
         will be ``thickness`` apart.
 
         :param bounds: the bounds, or line segments, to calculate x-values for
-        :type bounds: List[Vector]
+        :type bounds: List[Vector] or numpy.ndarray
         :param thickness: the spacing between x-values.
         :type thickness: float
         :return: the list of x-values spanning ``bounds``, separated by ``thickness``
@@ -355,41 +486,59 @@ class SimulatorMath:
 
         (left_x_value, right_x_value) = SimulatorMath.get_extreme_x_values(bounds)
 
-        x_values = []
-        x_values.append(left_x_value - thickness)
-
-        x_value = left_x_value
-        while x_value <= right_x_value + thickness:
-            x_values.append(x_value)
-            x_value += thickness
+        # One line before the left edge, then every line from the left edge up to one past the
+        # right edge. Each value is computed from its index, so there is no drift from repeated
+        # addition; the small tolerance keeps a line landing exactly on the last step
+        last_step = math.floor((right_x_value - left_x_value) / thickness + 1 + 1e-9)
 
-        return x_values
+        return (left_x_value + thickness * np.arange(-1, last_step + 1)).tolist()
 
     @staticmethod
-    def get_intersections_for_line_segments(x_value: float, points: List[Vector]) -> List[Vector]:
+    def get_intersections_for_line_segments(x_value: float,
+                                            points: Union[List[Vector], np.ndarray],
+                                            as_vectors: bool = True) -> List[Vector]:
         """
         Returns a list of points where the consecutive line segments represented by ``points``
         intersects the YZ plane at the X position ``x_value``. The result will be sorted by Y value.
+        Every segment is tested at once, following the rules of
+        :func:`~am3.util.SimulatorMath.get_intersection_at_x_position`. When intersecting the same
+        points many times, pass them as an array (see :func:`~am3.model.Path.vertices_array`) to
+        avoid converting them on every call.
 
         :param x_value: the x_value to intersect
         :type x_value: float
-        :param points: the points to intersect against the YZ plane at position ``x_value``
-        :type points: List[Vector]
+        :param points: the points to intersect against the YZ plane at position ``x_value``, as a
+            list of Vectors or an ``(n, 3)`` array
+        :type points: Union[List[Vector], np.ndarray]
+        :param as_vectors: pass ``False`` to get the points as ``(x, y, z)`` tuples instead of
+            Vectors, for callers that never need Vector math on them (default ``True``)
+        :type as_vectors: bool
         :return: the points where ``points`` intersected the YZ plane at ``x_value``
-        :rtype: List[Vector]
+        :rtype: List[Vector] or List[Tuple[float, float, float]]
         """
 
-        intersections = []
+        if not isinstance(points, np.ndarray):
+            points = np.array([point[:3] for point in points], dtype=np.float64).reshape(-1, 3)
+
+        (first, second) = (points[:-1], points[1:])
+        (first_x, second_x) = (first[:, 0], second[:, 0])
 
-        for i in range(0, len(points) - 1):
-            segment = LineSegment(points[i], points[i+1])
+        # Segments parallel to the plane never intersect it; the rest intersect it if x_value lies
+        # within their X range, endpoints included
+        hits = ((first_x != second_x)
+                & (np.minimum(first_x, second_x) <= x_value)
+                & (x_value <= np.maximum(first_x, second_x)))
+        (first, second) = (first[hits], second[hits])
 
-            intersection = SimulatorMath.get_intersection_at_x_position(segment, x_value)
-            if intersection is not None:
-                intersections.append(intersection)
+        t = (x_value - first[:, 0]) / (second[:, 0] - first[:, 0])
+        ys = first[:, 1] + (second[:, 1] - first[:, 1]) * t
 
-        intersections.sort(key=lambda point: point[1])
-        return intersections
+        # A stable sort, so intersections with equal Y keep the order of their segments
+        order = np.argsort(ys, kind='mergesort')
+        intersections = zip(ys[order].tolist(), first[order, 2].tolist())
+        if as_vectors:
+            return [Vector((x_value, y, z)) for (y, z) in intersections]
+        return [(x_value, y, z) for (y, z) in intersections]
 
     @staticmethod
     def estimate_execution_time(robots: List['Robot']) -> int:
@@ -416,8 +565,9 @@ class SimulatorMath:
         n = len(chunks)
         current_max = 0
 
+        exec_time = SimulatorMath.exec_time
         for i in range(0, n):
-            current_max = max(current_max, SimulatorMath.exec_time(network, network[i]))
+            current_max = max(current_max, exec_time(network, network[i]))
 
         return current_max
 
@@ -433,16 +583,39 @@ class SimulatorMath:
         :type chunk: Chunk
         :return: the execution time for ``chunk``, including its dependencies
         :rtype: int
+        :raises ValueError: if the dependencies of ``chunk`` form a cycle
         """
 
         if chunk.execution_time != -1:
             return chunk.execution_time
 
-        t_c = len(chunk.frame_data)
-
-        current_max = 0
-        for i in chunk.dependencies:
-            current_max = max(current_max, SimulatorMath.exec_time(network, network[i]))
-
-        chunk.execution_time = current_max + t_c
-        return current_max + t_c
+        # The dependencies are walked depth-first with an explicit stack, so long dependency
+        # chains can't exceed the recursion limit. Each entry is (chunk, expanded): a chunk is
+        # first expanded (its unfinished dependencies are pushed above it), then finished once
+        # they all have an execution time.
+        in_progress = set()
+        stack = [(chunk, False)]
+        while stack:
+            (current, expanded) = stack.pop()
+            if current.execution_time != -1:
+                continue
+
+            if expanded:
+                current_max = 0
+                for i in current.dependencies:
+                    current_max = max(current_max, network[i].execution_time)
+
+                current.execution_time = current_max + len(current.frame_data)
+                in_progress.discard(current.number)
+                continue
+
+            if current.number in in_progress:
+                raise ValueError('The dependencies of chunk {} form a cycle'.format(current.number))
+
+            in_progress.add(current.number)
+            stack.append((current, True))
+            for i in current.dependencies:
+                if network[i].execution_time == -1:
+                    stack.append((network[i], False))
+
+        return chunk.execution_time
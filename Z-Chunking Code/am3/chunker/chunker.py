@@ -8,9 +8,63 @@ from am3.util.simulatormath import *
 from am3.model import Chunk
 from math import radians
 
+#numba isn't bundled with Blender. If it has been installed into Blender's python the grid
+#kernels below are compiled, otherwise they run as plain python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 counter_value_f = 0
 
 
+def _connections(numeric_grid, check_number_1, check_number_2, target_value_1, target_value_2, change_to):
+    '''
+    Kernel for Chunker.connections, working on the grid in place. Cells are updated as the
+    sweep goes, so a change can spread further within the same sweep, and the sweeps stop
+    as soon as one of them changes nothing.
+    '''
+    y_index = numeric_grid.shape[0]
+    x_index = numeric_grid.shape[1]
+    max_iterations = max(x_index, y_index)
+    
+    iterations = 0
+    while numeric_grid.min() != 0 and iterations <= max_iterations:
+        changed = False
+        for i in range(0, x_index):
+            for j in range(0, y_index):
+                value = numeric_grid[j, i]
+                #check if the spot is either unchecked, or unsuitable for AG
+                if value != check_number_1 and value != check_number_2:
+                    continue
+                
+                #check if a neighbor (within the grid) is a suitable AG location or connected to one
+                connected = False
+                for x in range(max(i-1, 0), min(i+2, x_index)):
+                    for y in range(max(j-1, 0), min(j+2, y_index)):
+                        neighbor = numeric_grid[y, x]
+                        if neighbor == target_value_1 or neighbor == target_value_2:
+                            connected = True
+                            break
+                    if connected:
+                        break
+                
+                if connected and value != change_to:
+                    numeric_grid[j, i] = change_to
+                    changed = True
+        
+        if changed:
+            iterations += 1
+        else:
+            break
+    
+    return numeric_grid
+
+
+if njit is not None:
+    _connections = njit(cache=True, boundscheck=False)(_connections)
+
+
 class ChunkingParameters:
 
     build_plate_x = 300
@@ -152,115 +206,76 @@ class Chunker:
     @staticmethod
     def layer_locations(layer_islands_data, layer_split_number, layer_height):
         '''
-        This method is to do an exhaustive search of all layer splits that could make up
-        the vertical chunking for a job. It treats the set of layers as an integer (either
-        0, corresponding to an inactive cut, or 1, corresponding to an active cut). It 
-        treats the set of all cuts as a binary string of active and inactive cuts and 
-        generates a set of the best solution (least amount of distinct parts, islands or
-        vertical layers). Based on this set of lowest chunk number solutions, you can
-        optimize in different ways, the first of which will be implemented is to have
-        the chunk height be as equal as possible. 
-        '''
-        #FOR TESTING
-        # pdb.set_trace()
-        
-        split_status = np.zeros([2**layer_split_number,layer_split_number])
-        feasibility_array = np.ones(2**layer_split_number, dtype=bool)
-        num_chunks_array = np.zeros([2**layer_split_number,2])
-        for i in range(0,(2**layer_split_number)):
-            #convert index to binary
-            binary_string = bin(i)
-            
-            #assign 0 or 1 to each layer
-            j = layer_split_number-1
-            while j >= 0:
-                num_digits_bin = (len(binary_string)-2)
-                if layer_split_number - j <= num_digits_bin:
-                    split_status[i,j] = binary_string[j - (layer_split_number-len(binary_string))]
-                else:
-                    break
-                j -= 1
-            
-            #Check if combination feasible based on height
-            current_height = layer_height
-            for j in range(0, layer_split_number):
-                if split_status[i,j] == 1:
-                    current_height = 0
-                current_height += layer_height
-                
-                if current_height  > ChunkingParameters.max_reach_z:
-                    feasibility_array[i] = False
-                    break
-            
-            #figure out number of islands at each configuration
-            chunk_number = 0
-            no_AG_chunk_number = 0
-            if feasibility_array[i] == True:
-                for j in range(0, layer_split_number):
-                    chunk_number += split_status[i,j]*(1+layer_islands_data[0,j])
-                    no_AG_chunk_number += split_status[i,j]*(layer_islands_data[1,j])
-                num_chunks_array[i,0] = chunk_number
-                num_chunks_array[i,1] = no_AG_chunk_number
-            else:
-                num_chunks_array[i,0] = 1000
-                num_chunks_array[i,1] = 1000
+        This method finds the best set of layer splits that could make up the vertical
+        chunking for a job. Each of the layer boundaries is either an inactive cut (0) or
+        an active cut (1), and no vertical layer may be taller than max_reach_z. Among the
+        feasible sets of cuts, it picks the one with the least amount of distinct parts
+        (islands or vertical layers), then the fewest islands without AG's, and then the
+        one where the chunk heights are as equal as possible.
         
-        #FOR TESTING
-        # pdb.set_trace()
-        
-        #Find all the locations with minimum number of islands
-        min_row = np.amin(num_chunks_array, axis=0)
-        min_val = min_row[0]
-        min_locations = np.where(min_val == num_chunks_array) 
-        min_locations_array = np.copy(min_locations)
-        #these are the indexes of the combinations in num_chunks_array with fewest chunks
-        number_min_locations = np.size(min_locations[0])
+        Rather than trying every combination of cuts, the layers are walked from the
+        bottom up keeping only the best set of cuts for each (number of cuts so far,
+        layers since the last cut) pair, since the rest of the search only depends on
+        those two numbers. The chunk height evenness depends on the total number of cuts,
+        so the walk is done once for each possible number of cuts.
+        '''
+        max_reach_z = ChunkingParameters.max_reach_z
         
-        #compare number of no_AG_islands among min set
-        for i in range(0, number_min_locations):
-            index_array = min_locations[0]
-            min_locations_array[1,i] = num_chunks_array[index_array[0],1]
-        min_row_no_AG = np.amin(min_locations_array, axis=0)
-        min_val_no_AG = min_row_no_AG[0]
-        min_locations_no_AG = np.where(min_val_no_AG == min_locations_array) 
-        #these are the indexes in min_locations_array with fewest no AG islands
-        min_no_AG_array = min_locations_no_AG[1]
+        #heights of a run of layers since the last cut, summed the same way the layers stack
+        run_heights = [0.0]
+        while run_heights[-1] <= max_reach_z:
+            run_heights.append(run_heights[-1] + layer_height)
+        max_run = len(run_heights) - 2
         
-        #Next optimize for even height of layers
-        layer_diff_array = np.zeros(np.size(min_no_AG_array))
-        for i in range(0, np.size(min_no_AG_array)):
-            #get configuration from indexes
-            config_index = min_locations_array[0,min_no_AG_array[i]]
-            config = split_status[config_index]
-            num_splits = np.sum(config)
+        best_cost = None
+        best_cuts = []
+        for num_splits in range(0, layer_split_number+1):
             avg_layer_height = (layer_height*(layer_split_number+1))/(num_splits+1)
             
-            #calculate cumulative deviation from average layer height in all layers
-            current_height = layer_height
-            layer_height_diff = 0
+            #(cuts so far, layers since last cut) -> (chunks, no AG chunks, height deviation)
+            states = {(0, 1): (0, 0, 0)}
+            parents = []
             for j in range(0, layer_split_number):
-                if config[j] == 1:
-                    layer_height_diff += abs(current_height-avg_layer_height)
-                    current_height = 0
-                current_height += layer_height
-            layer_diff_array[i] = layer_height_diff
+                next_states = {}
+                layer_parents = {}
+                for ((cuts, run), (chunks, no_AG_chunks, height_diff)) in states.items():
+                    options = []
+                    #keep stacking layers
+                    if run+1 <= max_run:
+                        options.append(((cuts, run+1), (chunks, no_AG_chunks, height_diff), False))
+                    #cut here, which starts a new vertical layer
+                    if cuts < num_splits and 1 <= max_run:
+                        cost = (chunks + (1+layer_islands_data[0,j]),
+                                no_AG_chunks + layer_islands_data[1,j],
+                                height_diff + abs(run_heights[run]-avg_layer_height))
+                        options.append(((cuts+1, 1), cost, True))
+                    
+                    for (state, cost, cut) in options:
+                        if state not in next_states or cost < next_states[state]:
+                            next_states[state] = cost
+                            layer_parents[state] = ((cuts, run), cut)
+                states = next_states
+                parents.append(layer_parents)
             
-        #find minimum height and where that is
-        min_layer_diff = np.min(layer_diff_array)
-        min_layer_location = np.where(min_layer_diff == layer_diff_array)
-        min_layer_index = min_layer_location[0]
+            #only sets with exactly num_splits cuts count for this average height
+            for ((cuts, run), cost) in states.items():
+                if cuts == num_splits and (best_cost is None or cost < best_cost):
+                    best_cost = cost
+                    #follow the parents back down to find where the cuts are
+                    best_cuts = []
+                    state = (cuts, run)
+                    for j in range(layer_split_number-1, -1, -1):
+                        (state, cut) = parents[j][state]
+                        if cut:
+                            best_cuts.append(j)
+                    best_cuts.reverse()
         
-        #find config associated with the ideal traits found above
-        split_config_index = min_locations_array[0,min_no_AG_array[min_layer_index]]
-        split_config = np.array(split_status[split_config_index])
-        num_splits = int(np.sum(split_config))
+        #if no set of cuts was feasible, the model is left as a single vertical layer
+        num_splits = len(best_cuts)
         num_vertical_layers = num_splits+1
         split_locations_array = np.zeros(num_splits)
-        split_count = 0
-        for i in range(0,layer_split_number):
-            if split_config[0,i] == 1:
-                split_locations_array[split_count] = i*layer_height
-                split_count += 1
+        for (split_count, i) in enumerate(best_cuts):
+            split_locations_array[split_count] = i*layer_height
         return(num_vertical_layers, split_locations_array)
     
     @staticmethod
@@ -285,55 +300,42 @@ class Chunker:
         x_extreme = max(abs(x_min), abs(x_max))
         y_extreme = max(abs(y_min), abs(y_max))
         
-        x_val = x_min
-        y_val = y_min
         z_val = direction[2]*-10000
         
         #create grids
         x_size = (math.ceil(x_extreme*2/(AGParameters.grid_density)))
         y_size = (math.ceil(y_extreme*2/(AGParameters.grid_density)))
         location_grid = np.zeros((y_size,x_size))
-        success_grid = np.zeros((y_size,x_size), dtype = bool)
         x_step_size = (x_extreme*2)/(x_size-1)
         y_step_size = (y_extreme*2)/(y_size-1)
         
-        x_index = 0
-        y_index = 0
-        while x_val <= x_max:
-            while y_val <= y_max:
-                #FOR TESTING
-                # pdb.set_trace()
-                # print('x: ' +str(x_val))
-                # print('y: ' +str(y_val))
-                
-                ray_origin = Vector((x_val,y_val,z_val))
-                success, location, normal, val = model_object.ray_cast(ray_origin,direction)
+        #ray positions, from the minimum bound up to the maximum bound. Each one is computed from
+        #its index so the steps don't drift from repeated addition
+        x_values = x_min + x_step_size*np.arange(x_size)
+        x_values = x_values[x_values <= x_max].tolist()
+        y_values = y_min + y_step_size*np.arange(y_size)
+        y_values = y_values[y_values <= y_max].tolist()
+        
+        #rays that miss the model report the far side of the bounds
+        if direction[2] > 0:
+            location_grid[:len(y_values),:len(x_values)] = z_min
+        else:
+            location_grid[:len(y_values),:len(x_values)] = z_max
+        
+        #only the raycasts themselves are left in the loop
+        ray_cast = model_object.ray_cast
+        for (x_index, x_val) in enumerate(x_values):
+            for (y_index, y_val) in enumerate(y_values):
+                success, location, normal, val = ray_cast(Vector((x_val,y_val,z_val)),direction)
                 if success == True:
                     location_grid[y_index,x_index] = location[2]
-                else:
-                    if direction[2] > 0:
-                        location_grid[y_index,x_index] = z_min
-                    else:
-                        location_grid[y_index,x_index] = z_max
-                y_val += y_step_size
-                y_index += 1
-            y_index = 0
-            y_val = y_min
-            x_val += x_step_size
-            x_index += 1
-        
-        #FOR TESTING
-        # pdb.set_trace()
             
         if direction[2] < 0:
             extreme_location = np.max(location_grid)
         else:
             extreme_location = np.min(location_grid)
                 
-        for j in range(0,y_size):
-            for i in range(0,x_size):
-                if abs(location_grid[j,i] - layer_location) <= 1:
-                    success_grid[j,i] = True
+        success_grid = np.abs(location_grid - layer_location) <= 1
         
         #FOR TESTING
         # pdb.set_trace()
@@ -380,47 +382,33 @@ class Chunker:
         means suitable location for a minimum size AG, 2 means connected to a
         suitable AG location
         '''
-        #create numeric grid
-        numeric_grid = -np.ones((y_index,x_index))
-        for i in range(0,x_index):
-            for j in range(0,y_index):
-                if success[j,i] == False:
-                    numeric_grid[j,i] = 0
-                    
-        #Set start point and 
-        y_count = 0
-        x_count = 0
+        #create numeric grid. It only ever holds -1 to 2, so int8 keeps it small
+        numeric_grid = np.full((y_index,x_index), -1, dtype=np.int8)
+        numeric_grid[success == False] = 0
         
-        #start loop to check for all viable AG positions
-        while x_count < x_index:
-            while y_count < y_index:
-                
-                y_pos = y_min + (y_count)*y_step_size
-                x_pos = x_min + (x_count)*x_step_size
-                #skip points too close to boundary
-                if abs(abs(y_pos)-y_extreme) < clearance or abs(abs(x_pos)-x_extreme)< clearance:
-                    Pass = False
-                #only consider not yet checked points:
-                elif numeric_grid[y_count,x_count] == -1:
-                    # pdb.set_trace()
-                    # check all neighboring points within bounding box of min AG
-                    Pass = True
-                    for i in range(-x_gap,x_gap+1):
-                        for j in range(-y_gap,y_gap+1):
-                            if numeric_grid[y_count+j,x_count+i] == 0:
-                                Pass = False
-                    # if all neighboring points are also good, AG location good
-                    if Pass == True:
-                        numeric_grid[y_count,x_count] = 1
-                        
-                    else:
-                        numeric_grid[y_count,x_count] = -1
-                #skip everything else
-                else:
-                    Pass = False
-                y_count += 1
-            y_count = 0
-            x_count += 1
+        #count the unsuccessful points in the bounding box of a min AG around every point at
+        #once, using a summed area table of the unsuccessful points. Boxes that reach past the
+        #start of the grid wrap around to the other side, as the negative indexes did when each
+        #box was checked point by point
+        failed = np.pad((numeric_grid == 0).astype(np.int32), ((y_gap,y_gap),(x_gap,x_gap)), mode='wrap')
+        failed_sums = np.zeros((failed.shape[0]+1, failed.shape[1]+1), dtype=np.int32)
+        failed_sums[1:,1:] = failed.cumsum(axis=0).cumsum(axis=1)
+        box_y = 2*y_gap+1
+        box_x = 2*x_gap+1
+        box_failures = (failed_sums[box_y:,box_x:] - failed_sums[:-box_y,box_x:]
+                        - failed_sums[box_y:,:-box_x] + failed_sums[:-box_y,:-box_x])
+        
+        #skip points too close to boundary
+        y_pos = y_min + np.arange(y_index)*y_step_size
+        x_pos = x_min + np.arange(x_index)*x_step_size
+        y_clear = np.abs(np.abs(y_pos)-y_extreme) >= clearance
+        x_clear = np.abs(np.abs(x_pos)-x_extreme) >= clearance
+        
+        #a not yet checked point is a good AG location if all neighboring points within the
+        #bounding box of a min AG are also good
+        Pass = (y_clear[:,np.newaxis] & x_clear[np.newaxis,:]
+                & (numeric_grid == -1) & (box_failures == 0))
+        numeric_grid[Pass] = 1
 
         # pdb.set_trace()    
         
@@ -433,7 +421,9 @@ class Chunker:
         This method creates an island map, counts the number of islands
         as well as the number of islands without an AG
         '''
-        islands_grid = -(numeric_grid)*10
+        #island numbers can go well past int8, and even int16 on a fine grid, so the
+        #islands grid is int32
+        islands_grid = -(numeric_grid.astype(np.int32))*10
         island_number = 1
         no_AG_island_number = 0
         
@@ -463,45 +453,7 @@ class Chunker:
         neighbor to check for (target_values) and the number to change to if the neighbors meet that
         criteria (change_to)
         '''    
-        iterations = 0
-        while np.min(numeric_grid) != 0 and iterations <= max(x_index,y_index):
-            #create a duplicate to compare to. If it doesn't change between iterations, stop
-            dup_numeric_grid = np.copy(numeric_grid)
-            
-            #first loop over the entire area
-            for i in range (0,x_index):
-                for j in range(0,y_index):
-                    #check if the spot is either unchecked, or unsuitable for AG
-                    if numeric_grid[j,i] == check_number_1 or numeric_grid[j,i] == check_number_2:
-                        Connected = False
-                        #loop over neighbors
-                        for x in range(-1,2):
-                            for y in range(-1,2):
-                                #check if the neighbor is a suitable AG location or connected to one
-                                #skip points out of bounds
-                                if j+y >= y_index or j+y < 0 or i+x >= x_index or i+x < 0 :
-                                    continue
-                                else:    
-                                    if numeric_grid[j+y,i+x] == target_value_1 or numeric_grid[j+y,i+x] == target_value_2:
-                                        Connected = True
-                                    else:
-                                        continue
-                                
-                                if Connected == True:
-                                    break
-                            if Connected == True:
-                                break
-                            
-                        if Connected == True:
-                            numeric_grid[j,i] = change_to
-                    
-            #check if any change was made
-            if np.array_equal(numeric_grid, dup_numeric_grid):
-                iterations = max(x_index,y_index)+1
-            else:
-                iterations += 1
-            
-        return(numeric_grid)
+        return _connections(numeric_grid, check_number_1, check_number_2, target_value_1, target_value_2, change_to)
     
     @staticmethod    
     def AG_locations(model_bounds, TS, min_rad, max_rad):
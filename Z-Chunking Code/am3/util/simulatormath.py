@@ -1,10 +1,15 @@
 from mathutils import Vector
 from mathutils import Euler
 import math
+from collections import namedtuple
+import numpy as np
 
 import am3
 from am3.slicer.geometry import LineSegment
 
+AxisBounds = namedtuple('AxisBounds', 'min max distance')
+ObjectBounds = namedtuple('ObjectBounds', 'x y z')
+
 class SimulatorMath:
     @staticmethod
     def calculate_bounds(obj, local=False):
@@ -17,22 +22,12 @@ class SimulatorMath:
         else:
             coords = [p[:] for p in local_coords]
 
-        rotated = zip(*coords[::-1])
-
-        push_axis = []
-        for (axis, _list) in zip('xyz', rotated):
-            info = lambda: None
-            info.max = max(_list)
-            info.min = min(_list)
-            info.distance = info.max - info.min
-            push_axis.append(info)
-
-        import collections
-
-        originals = dict(zip(['x', 'y', 'z'], push_axis))
+        # One row per corner, so each axis is a column of the array
+        coords = np.array(coords, dtype=np.float64)
+        lows = coords.min(axis=0).tolist()
+        highs = coords.max(axis=0).tolist()
 
-        o_details = collections.namedtuple('object_details', 'x y z')
-        return o_details(**originals)
+        return ObjectBounds(*(AxisBounds(low, high, high - low) for (low, high) in zip(lows, highs)))
 
     # Returns the shortest distance from point to the line. Disregards Z coordinate
     @staticmethod
@@ -90,11 +85,7 @@ class SimulatorMath:
 
     @staticmethod
     def sign(number):
-        if (number > 0):
-            return 1
-        if (number < 0):
-            return -1
-        return 0
+        return int(number > 0) - int(number < 0)
 
     # Checks if line (in XY plane) intersects bounds (in XY plane).
     # Bound corner labels:
@@ -4,6 +4,8 @@ import sys
 import json
 import argparse
 from math import radians
+from collections import namedtuple
+import numpy as np
 from mathutils import Matrix
 
 parser = argparse.ArgumentParser()
@@ -105,6 +107,10 @@ def write_layer_information(layers):
     write_string_to_file(json.dumps(layers), outfile)
 
 
+AxisBounds = namedtuple("AxisBounds", "min max distance")
+ObjectBounds = namedtuple("ObjectBounds", "x y z")
+
+
 def calculate_bounds(obj, local=False):
     local_coordinates = obj.bound_box[:]
     object_matrix = obj.matrix_world
@@ -115,22 +121,12 @@ def calculate_bounds(obj, local=False):
     else:
         coordinates = [p[:] for p in local_coordinates]
 
-    rotated = zip(*coordinates[::-1])
-
-    push_axis = []
-    for (axis, _list) in zip("xyz", rotated):
-        info = lambda: None
-        info.max = max(_list)
-        info.min = min(_list)
-        info.distance = info.max - info.min
-        push_axis.append(info)
-
-    import collections
-
-    originals = dict(zip(["x", "y", "z"], push_axis))
+    # One row per corner, so each axis is a column of the array
+    coordinates = np.array(coordinates, dtype=np.float64)
+    lows = coordinates.min(axis=0).tolist()
+    highs = coordinates.max(axis=0).tolist()
 
-    o_details = collections.namedtuple("object_details", "x y z")
-    return o_details(**originals)
+    return ObjectBounds(*(AxisBounds(low, high, high - low) for (low, high) in zip(lows, highs)))
 
 
 def align_models_on_build_plate(model):